@@ -2,12 +2,15 @@ import streamlit as st
 # from streamlit_navigation_bar import st_navbar
 
 import datetime
-from data_loader import get_sp500_components, load_data, convert_df_to_csv
+import pandas as pd
+from data_loader import load_data, get_data_provider
+from constituents import list_universes, load_snapshot, get_search_index, refresh_in_background
+from export import EXPORT_FORMATS, MAX_EXPORT_BYTES, ExportTooLargeError, iter_ticker_frames, export_to_file
+from cache import cache_stats
 # from indicators import calculate_macd, calculate_atr, calculate_obv, calculate_stochastic
 from plotting import plot_stock_chart
-from utils import configure_cufflinks
-
-configure_cufflinks()
+from indicators import MOVING_AVERAGES
+from patterns import PATTERNS
 
 # User Interface
 
@@ -20,8 +23,8 @@ st.set_page_config(
 # st.title("Technical Stock Analysis by Fintelligence")
 st.write("""
     ### User manual
-    * You can select any company from the S&P 500 constituents
-    * Customize technical indicators from the sidebar
+    * You can select any company from the S&P 500 or Nasdaq-100 constituents, or from your own watchlists
+    * Customize technical indicators and candlestick pattern markers from the sidebar
     * Access the Most sophisticated Financial Intelligence Multi Agentic system, for advanced analysis
 """)
 st.markdown("---")
@@ -30,13 +33,26 @@ st.caption("Author: Ihtisham M | [LinkedIn](https://www.linkedin.com/in/ihtisham
 
 
 st.sidebar.header("Stock Parameters")
-available_tickers, tickers_companies_dict = get_sp500_components()
+universe = st.sidebar.selectbox("Universe", list_universes())
+constituents = load_snapshot(universe)
+refresh_in_background(universe)
+universe_tickers = constituents["Symbol"].to_list()
+tickers_companies_dict = dict(zip(constituents["Symbol"], constituents["Security"]))
+tickers_sectors_dict = dict(zip(constituents["Symbol"], constituents["Sector"]))
+
+search_query = st.sidebar.text_input("Search ticker or company")
+available_tickers = get_search_index(universe).search(search_query, limit=None) if search_query else universe_tickers
+if not available_tickers:
+    st.sidebar.warning(f"No constituents match '{search_query}'")
+    st.stop()
 
 ticker = st.sidebar.selectbox(
     "Ticker",
     available_tickers,
     format_func=tickers_companies_dict.get
 )
+if tickers_sectors_dict[ticker]:
+    st.sidebar.caption(f"Sector: {tickers_sectors_dict[ticker]}")
 start_date = st.sidebar.date_input(
     "Start date",
     datetime.date(2024, 1, 1)
@@ -164,26 +180,168 @@ stoch_d = exp_stoch.number_input(
     step=1
 )
 
+# EMA/WMA/HMA/Wilder moving average options
+exp_ma = st.sidebar.expander("Moving Average (EMA/WMA/HMA)")
+ma_flag = exp_ma.checkbox(label="Add Moving Average")
+ma_type = exp_ma.selectbox("Type", list(MOVING_AVERAGES))
+ma_periods = exp_ma.number_input(
+    label="MA Periods",
+    min_value=2,
+    max_value=200,
+    value=20,
+    step=1
+)
 
-df = load_data(ticker, start_date, end_date)
+# VWAP options
+exp_vwap = st.sidebar.expander("VWAP")
+vwap_flag = exp_vwap.checkbox(label="Add VWAP")
+vwap_period = exp_vwap.number_input(
+    label="VWAP Period (0 = anchored at start date)",
+    min_value=0,
+    max_value=200,
+    value=0,
+    step=1
+)
 
-data_exp = st.expander("Preview data")
-available_cols = df.columns.tolist()
-columns_to_show = data_exp.multiselect(
-    "Columns",
-    available_cols,
-    default=available_cols
+# ADX / DMI options
+exp_adx = st.sidebar.expander("ADX / DMI")
+adx_flag = exp_adx.checkbox(label="Add ADX")
+adx_period = exp_adx.number_input(
+    label="ADX Period",
+    min_value=5,
+    max_value=50,
+    value=14,
+    step=1
 )
 
-data_exp.dataframe(df[columns_to_show])
-csv_file = convert_df_to_csv(df[columns_to_show])
-data_exp.download_button(
-    label="Download selected as CSV",
-    data=csv_file,
-    file_name=f"{ticker}_stock_prices.csv",
-    mime="text/csv",
+# Ichimoku Cloud options
+exp_ichimoku = st.sidebar.expander("Ichimoku Cloud")
+ichimoku_flag = exp_ichimoku.checkbox(label="Add Ichimoku Cloud")
+ichimoku_conversion = exp_ichimoku.number_input(
+    label="Conversion Line Period",
+    min_value=2,
+    max_value=50,
+    value=9,
+    step=1
+)
+ichimoku_base = exp_ichimoku.number_input(
+    label="Base Line Period",
+    min_value=5,
+    max_value=100,
+    value=26,
+    step=1
+)
+ichimoku_span_b = exp_ichimoku.number_input(
+    label="Leading Span B Period",
+    min_value=10,
+    max_value=200,
+    value=52,
+    step=1
+)
+
+# Keltner Channel options
+exp_keltner = st.sidebar.expander("Keltner Channels")
+keltner_flag = exp_keltner.checkbox(label="Add Keltner Channels")
+keltner_periods = exp_keltner.number_input(
+    label="EMA Periods",
+    min_value=5,
+    max_value=100,
+    value=20,
+    step=1
+)
+keltner_atr = exp_keltner.number_input(
+    label="ATR Periods",
+    min_value=5,
+    max_value=50,
+    value=10,
+    step=1
+)
+keltner_multiplier = exp_keltner.number_input(
+    label="ATR Multiplier",
+    min_value=0.5,
+    max_value=5.0,
+    value=2.0,
+    step=0.5
+)
+
+# Parabolic SAR options
+exp_psar = st.sidebar.expander("Parabolic SAR")
+psar_flag = exp_psar.checkbox(label="Add Parabolic SAR")
+psar_step = exp_psar.number_input(
+    label="Acceleration Step",
+    min_value=0.01,
+    max_value=0.1,
+    value=0.02,
+    step=0.01
+)
+psar_max_step = exp_psar.number_input(
+    label="Maximum Acceleration",
+    min_value=0.1,
+    max_value=0.5,
+    value=0.2,
+    step=0.05
+)
+
+# Williams %R options
+exp_willr = st.sidebar.expander("Williams %R")
+willr_flag = exp_willr.checkbox(label="Add Williams %R")
+willr_period = exp_willr.number_input(
+    label="Williams %R Period",
+    min_value=5,
+    max_value=50,
+    value=14,
+    step=1
+)
+
+# CCI options
+exp_cci = st.sidebar.expander("Commodity Channel Index")
+cci_flag = exp_cci.checkbox(label="Add CCI")
+cci_period = exp_cci.number_input(
+    label="CCI Period",
+    min_value=5,
+    max_value=50,
+    value=20,
+    step=1
+)
+
+# MFI options
+exp_mfi = st.sidebar.expander("Money Flow Index")
+mfi_flag = exp_mfi.checkbox(label="Add MFI")
+mfi_period = exp_mfi.number_input(
+    label="MFI Period",
+    min_value=5,
+    max_value=50,
+    value=14,
+    step=1
 )
 
+# Candlestick pattern options
+exp_patterns = st.sidebar.expander("Candlestick Patterns")
+patterns_flag = exp_patterns.checkbox(label="Mark Patterns")
+selected_patterns = exp_patterns.multiselect(
+    "Patterns",
+    list(PATTERNS),
+    default=list(PATTERNS)
+)
+
+# Cache usage
+exp_cache = st.sidebar.expander("Cache")
+
+
+df = load_data(ticker, start_date, end_date)
+if hasattr(get_data_provider(), "latest_time"):
+    st.sidebar.info(f"Replay mode: bars up to {get_data_provider().latest_time(ticker).date()}. Rerun to pick up new bars.")
+st.sidebar.write("Available columns:", ", ".join(df.columns))
+quality_issues = {
+    "duplicate bars": df.attrs["quality"].get("duplicates", 0),
+    "missing trading days": df.attrs["quality"].get("missing_days", 0),
+    "zero-volume bars": df.attrs["quality"].get("zero_volume", 0),
+    "bars with missing prices": df.attrs["quality"].get("nan_prices", 0),
+    "inconsistent OHLC bars": df.attrs["quality"].get("inconsistent_bars", 0),
+}
+if any(quality_issues.values()):
+    st.sidebar.warning("Data quality: " + ", ".join(f"{count} {issue}" for issue, count in quality_issues.items() if count))
+
 # Prepare indicator parameters for plotting function
 indicator_params = {
     "volume_flag": volume_flag,
@@ -206,8 +364,82 @@ indicator_params = {
     "stoch_flag": stoch_flag,
     "stoch_k": stoch_k,
     "stoch_d": stoch_d,
+    "ma_flag": ma_flag,
+    "ma_type": ma_type,
+    "ma_periods": ma_periods,
+    "vwap_flag": vwap_flag,
+    "vwap_period": vwap_period,
+    "adx_flag": adx_flag,
+    "adx_period": adx_period,
+    "ichimoku_flag": ichimoku_flag,
+    "ichimoku_conversion": ichimoku_conversion,
+    "ichimoku_base": ichimoku_base,
+    "ichimoku_span_b": ichimoku_span_b,
+    "keltner_flag": keltner_flag,
+    "keltner_periods": keltner_periods,
+    "keltner_atr": keltner_atr,
+    "keltner_multiplier": keltner_multiplier,
+    "psar_flag": psar_flag,
+    "psar_step": psar_step,
+    "psar_max_step": psar_max_step,
+    "willr_flag": willr_flag,
+    "willr_period": willr_period,
+    "cci_flag": cci_flag,
+    "cci_period": cci_period,
+    "mfi_flag": mfi_flag,
+    "mfi_period": mfi_period,
+    "patterns_flag": patterns_flag,
+    "patterns": selected_patterns,
 }
 
+data_exp = st.expander("Preview data")
+available_cols = df.columns.tolist()
+columns_to_show = data_exp.multiselect(
+    "Columns",
+    available_cols,
+    default=available_cols
+)
+
+data_exp.dataframe(df[columns_to_show])
+
+# Export options
+export_format = data_exp.selectbox("Format", list(EXPORT_FORMATS))
+export_tickers = data_exp.multiselect(
+    "Tickers",
+    universe_tickers,
+    default=[ticker],
+    format_func=tickers_companies_dict.get
+)
+export_indicators = data_exp.checkbox(label="Include selected indicators")
+data_exp.caption(f"Exports are limited to {MAX_EXPORT_BYTES // 1024 ** 2} MB; "
+                 "select fewer tickers or a shorter range for larger data sets.")
+if data_exp.button("Prepare download", disabled=not export_tickers):
+    with st.spinner("Preparing export..."):
+        frames = iter_ticker_frames(
+            export_tickers,
+            start_date,
+            end_date,
+            indicator_params if export_indicators else None,
+            columns_to_show
+        )
+        try:
+            # download_button only takes bytes (or a few io types it reads whole), so the
+            # capped export is read into memory here
+            with export_to_file(frames, export_format) as export_file:
+                export_data = export_file.read()
+        except ExportTooLargeError as e:
+            export_data = None
+            data_exp.error(f"{e}. Select fewer tickers or a shorter range.")
+    if export_data is not None:
+        export_name = ticker if export_tickers == [ticker] else f"{len(export_tickers)}_tickers"
+        data_exp.download_button(
+            label=f"Download selected as {export_format}",
+            data=export_data,
+            file_name=f"{export_name}_stock_prices.{EXPORT_FORMATS[export_format]['extension']}",
+            mime=EXPORT_FORMATS[export_format]["mime"],
+            on_click="ignore",
+        )
+
 plot_stock_chart(df, ticker, tickers_companies_dict, indicator_params)
 
 # Add a section for technical analysis summary
@@ -251,6 +483,37 @@ if 'Close' in df.columns:
                 macd_trend = "STRENGTHENING" if latest_hist > 0 else "WEAKENING"
                 st.write(f"**MACD:** {latest_macd:.2f} - Signal: {macd_cross_signal}, Trend: {macd_trend}")
 
+        if ma_flag:
+            if f'{ma_type}_{ma_periods}' in df.columns:
+                latest_ma = df[f'{ma_type}_{ma_periods}'].iloc[-1]
+                ma_signal = "BULLISH" if latest_close > latest_ma else "BEARISH"
+                st.write(f"**{ma_type} ({ma_periods}):** ${latest_ma:.2f} - Signal: {ma_signal}")
+
+        if vwap_flag:
+            if 'VWAP' in df.columns:
+                latest_vwap = df['VWAP'].iloc[-1]
+                vwap_signal = "BULLISH" if latest_close > latest_vwap else "BEARISH"
+                st.write(f"**VWAP:** ${latest_vwap:.2f} - Signal: {vwap_signal}")
+
+        if adx_flag:
+            if 'ADX' in df.columns:
+                latest_adx = df['ADX'].iloc[-1]
+                adx_strength = "STRONG TREND" if latest_adx > 25 else "WEAK TREND"
+                adx_direction = "BULLISH" if df['+DI'].iloc[-1] > df['-DI'].iloc[-1] else "BEARISH"
+                st.write(f"**ADX ({adx_period}):** {latest_adx:.2f} - {adx_strength}, Direction: {adx_direction}")
+
+        if ichimoku_flag:
+            if 'Senkou_Span_A' in df.columns and 'Senkou_Span_B' in df.columns:
+                cloud_top = max(df['Senkou_Span_A'].iloc[-1], df['Senkou_Span_B'].iloc[-1])
+                cloud_bottom = min(df['Senkou_Span_A'].iloc[-1], df['Senkou_Span_B'].iloc[-1])
+                if latest_close > cloud_top:
+                    ichimoku_signal = "BULLISH"
+                elif latest_close < cloud_bottom:
+                    ichimoku_signal = "BEARISH"
+                else:
+                    ichimoku_signal = "NEUTRAL"
+                st.write(f"**Ichimoku:** Price vs cloud - Signal: {ichimoku_signal}")
+
     with col2:
         if bb_flag:
             if 'Upper_Band' in df.columns and 'Lower_Band' in df.columns:
@@ -282,4 +545,61 @@ if 'Close' in df.columns:
             if 'ATR' in df.columns:
                 latest_atr = df['ATR'].iloc[-1]
                 atr_percent = (latest_atr / latest_close) * 100
-                st.write(f"**ATR ({atr_period}):** ${latest_atr:.2f} ({atr_percent:.2f}% of price)")
\ No newline at end of file
+                st.write(f"**ATR ({atr_period}):** ${latest_atr:.2f} ({atr_percent:.2f}% of price)")
+
+        if keltner_flag:
+            if 'Keltner_Upper' in df.columns and 'Keltner_Lower' in df.columns:
+                latest_k_upper = df['Keltner_Upper'].iloc[-1]
+                latest_k_lower = df['Keltner_Lower'].iloc[-1]
+                if latest_close > latest_k_upper:
+                    keltner_signal = "BREAKOUT UP"
+                elif latest_close < latest_k_lower:
+                    keltner_signal = "BREAKOUT DOWN"
+                else:
+                    keltner_signal = "INSIDE CHANNEL"
+                st.write(f"**Keltner Channels:** Signal: {keltner_signal}")
+                st.write(f"  - Upper: ${latest_k_upper:.2f}")
+                st.write(f"  - Lower: ${latest_k_lower:.2f}")
+
+        if psar_flag:
+            if 'PSAR' in df.columns:
+                latest_psar = df['PSAR'].iloc[-1]
+                psar_signal = "BULLISH" if latest_close > latest_psar else "BEARISH"
+                st.write(f"**Parabolic SAR:** ${latest_psar:.2f} - Signal: {psar_signal}")
+
+        if willr_flag:
+            if 'Williams_%R' in df.columns:
+                latest_willr = df['Williams_%R'].iloc[-1]
+                if latest_willr > -20:
+                    willr_signal = "OVERBOUGHT"
+                elif latest_willr < -80:
+                    willr_signal = "OVERSOLD"
+                else:
+                    willr_signal = "NEUTRAL"
+                st.write(f"**Williams %R ({willr_period}):** {latest_willr:.2f} - Signal: {willr_signal}")
+
+        if cci_flag:
+            if 'CCI' in df.columns:
+                latest_cci = df['CCI'].iloc[-1]
+                if latest_cci > 100:
+                    cci_signal = "OVERBOUGHT"
+                elif latest_cci < -100:
+                    cci_signal = "OVERSOLD"
+                else:
+                    cci_signal = "NEUTRAL"
+                st.write(f"**CCI ({cci_period}):** {latest_cci:.2f} - Signal: {cci_signal}")
+
+        if mfi_flag:
+            if 'MFI' in df.columns:
+                latest_mfi = df['MFI'].iloc[-1]
+                if latest_mfi > 80:
+                    mfi_signal = "OVERBOUGHT"
+                elif latest_mfi < 20:
+                    mfi_signal = "OVERSOLD"
+                else:
+                    mfi_signal = "NEUTRAL"
+                st.write(f"**MFI ({mfi_period}):** {latest_mfi:.2f} - Signal: {mfi_signal}")
+
+stats = cache_stats()
+exp_cache.write(f"**Memory:** {stats['bytes'] / 1024**2:.1f} / {stats['max_bytes'] / 1024**2:.0f} MB in {stats['entries']} entries")
+exp_cache.dataframe(pd.DataFrame(stats["namespaces"]).T[["entries", "bytes", "hits", "misses", "evictions", "expirations"]])
@@ -0,0 +1,243 @@
+import os
+import sys
+import threading
+import time
+import types
+import functools
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Global byte budget shared by every namespace in this process
+DEFAULT_BUDGET_BYTES = int(os.environ.get("CACHE_BUDGET_MB", "512")) * 1024 * 1024
+
+# Values sized directly by sys.getsizeof
+_SCALAR_TYPES = {str, int, float, bool, type(None)}
+
+
+def estimate_size(value, _seen=None):
+    """
+    Estimates the memory footprint of a cached value in bytes.
+    Containers and plain objects are walked recursively, counting each object once;
+    plotly figures are measured by their figure dict.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if type(value) in _SCALAR_TYPES:
+        return sys.getsizeof(value)
+
+    # Objects referenced more than once (or in a cycle) are counted the first time only.
+    # They stay referenced here so a temporary's id can't be reused within one estimate
+    _seen = {} if _seen is None else _seen
+    if id(value) in _seen:
+        return 0
+    _seen[id(value)] = value
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + _items_size(value.keys(), _seen) + _items_size(value.values(), _seen)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + _items_size(value, _seen)
+    if hasattr(value, "to_plotly_json"):
+        # Walking a figure's attributes would reach plotly's validators and parent links instead
+        return sys.getsizeof(value) + estimate_size(value.to_plotly_json(), _seen)
+    if hasattr(value, "__dict__") and not isinstance(value, (type, types.ModuleType, types.FunctionType)):
+        # Plain objects such as constituents.TickerIndex
+        return sys.getsizeof(value) + estimate_size(vars(value), _seen)
+    return sys.getsizeof(value)
+
+
+def _items_size(items, seen):
+    # Scalars are sized inline: long lists of floats and strings are the common case
+    return sum(sys.getsizeof(v) if type(v) in _SCALAR_TYPES else estimate_size(v, seen) for v in items)
+
+
+def _freeze(value):
+    """Turns call arguments into a hashable cache key."""
+    if isinstance(value, pd.DataFrame):
+        return (
+            "DataFrame",
+            tuple(map(str, value.columns)),
+            value.shape,
+            int(pd.util.hash_pandas_object(value, index=True).sum()),
+        )
+    if isinstance(value, pd.Series):
+        return ("Series", str(value.name), int(pd.util.hash_pandas_object(value, index=True).sum()))
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _copy_out(value):
+    """Returns a copy that callers may add columns to without touching the cache."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    return value
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value, size, expires_at):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+class BoundedCache:
+    """
+    Process-wide LRU cache with a global byte budget.
+    Each namespace can carry its own byte quota, entry limit and TTL.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_BUDGET_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (namespace, key) -> _Entry, oldest first
+        self._namespaces = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def configure_namespace(self, namespace, max_bytes=None, max_entries=None, ttl=None):
+        """Registers (or updates) the limits of a namespace."""
+        with self._lock:
+            ns = self._namespaces.setdefault(namespace, {
+                "max_bytes": None,
+                "max_entries": None,
+                "ttl": None,
+                "bytes": 0,
+                "entries": 0,
+                "hits": 0,
+                "misses": 0,
+                "evictions": 0,
+                "expirations": 0,
+            })
+            ns["max_bytes"] = max_bytes
+            ns["max_entries"] = max_entries
+            ns["ttl"] = ttl
+            self._enforce(namespace)
+
+    def get(self, namespace, key):
+        """Returns (hit, value) and marks the entry as recently used."""
+        with self._lock:
+            ns = self._namespaces[namespace]
+            entry = self._entries.get((namespace, key))
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove((namespace, key))
+                ns["expirations"] += 1
+                entry = None
+            if entry is None:
+                ns["misses"] += 1
+                return False, None
+            self._entries.move_to_end((namespace, key))
+            ns["hits"] += 1
+            return True, entry.value
+
+    def set(self, namespace, key, value):
+        """Stores a value, evicting least recently used entries to stay within limits."""
+        size = estimate_size(value)
+        with self._lock:
+            ns = self._namespaces[namespace]
+            # Values larger than the quota would flush everything and still not fit
+            if size > self.max_bytes or (ns["max_bytes"] is not None and size > ns["max_bytes"]):
+                return
+            if (namespace, key) in self._entries:
+                self._remove((namespace, key))
+            expires_at = time.monotonic() + ns["ttl"] if ns["ttl"] else None
+            self._entries[(namespace, key)] = _Entry(value, size, expires_at)
+            self._bytes += size
+            ns["bytes"] += size
+            ns["entries"] += 1
+            self._enforce(namespace)
+
+    def clear(self, namespace=None):
+        """Drops every entry, or only those of one namespace."""
+        with self._lock:
+            for full_key in [k for k in self._entries if namespace is None or k[0] == namespace]:
+                self._remove(full_key)
+
+    def stats(self):
+        """Returns a snapshot of the global and per-namespace counters."""
+        with self._lock:
+            self._purge_expired()
+            return {
+                "max_bytes": self.max_bytes,
+                "bytes": self._bytes,
+                "entries": len(self._entries),
+                "namespaces": {name: dict(ns) for name, ns in self._namespaces.items()},
+            }
+
+    def _remove(self, full_key):
+        entry = self._entries.pop(full_key)
+        ns = self._namespaces[full_key[0]]
+        self._bytes -= entry.size
+        ns["bytes"] -= entry.size
+        ns["entries"] -= 1
+
+    def _evict_oldest(self, namespace=None):
+        for full_key in self._entries:
+            if namespace is None or full_key[0] == namespace:
+                self._remove(full_key)
+                self._namespaces[full_key[0]]["evictions"] += 1
+                return
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        expired = [k for k, e in self._entries.items() if e.expires_at is not None and e.expires_at <= now]
+        for full_key in expired:
+            self._remove(full_key)
+            self._namespaces[full_key[0]]["expirations"] += 1
+
+    def _enforce(self, namespace):
+        ns = self._namespaces[namespace]
+        if ns["bytes"] > (ns["max_bytes"] or float("inf")) or self._bytes > self.max_bytes:
+            self._purge_expired()
+        while ns["max_entries"] is not None and ns["entries"] > ns["max_entries"]:
+            self._evict_oldest(namespace)
+        while ns["max_bytes"] is not None and ns["bytes"] > ns["max_bytes"]:
+            self._evict_oldest(namespace)
+        while self._bytes > self.max_bytes and self._entries:
+            self._evict_oldest()
+
+
+_cache = BoundedCache()
+
+
+def cached(namespace, max_bytes=None, max_entries=None, ttl=None):
+    """
+    Decorator that memoizes a function in the shared bounded cache.
+    DataFrame arguments are hashed by content, like st.cache_data does.
+    """
+    _cache.configure_namespace(namespace, max_bytes=max_bytes, max_entries=max_entries, ttl=ttl)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Functions may share a namespace, so the key includes the function itself
+            key = (func.__module__, func.__qualname__, _freeze(args), _freeze(kwargs))
+            hit, value = _cache.get(namespace, key)
+            if not hit:
+                value = func(*args, **kwargs)
+                _cache.set(namespace, key, value)
+            return _copy_out(value)
+
+        wrapper.clear = functools.partial(_cache.clear, namespace)
+        return wrapper
+
+    return decorator
+
+
+def cache_stats():
+    """Returns live usage statistics for the shared cache."""
+    return _cache.stats()
+
+
+def clear_cache(namespace=None):
+    """Clears the shared cache, or a single namespace of it."""
+    _cache.clear(namespace)
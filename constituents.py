@@ -0,0 +1,327 @@
+"""
+Versioned local store of index constituents with a ticker/company search index.
+
+Usage: python constituents.py refresh [universe ...]
+       python constituents.py diff <universe> [old_version new_version]
+"""
+import bisect
+import datetime
+import difflib
+import json
+import os
+import re
+import sys
+import threading
+
+import pandas as pd
+from cache import cached
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "constituents")
+
+# Snapshots older than this are refreshed in the background
+MAX_SNAPSHOT_AGE = datetime.timedelta(days=1)
+
+# Wait after a failed refresh, doubled per consecutive failure (up to the snapshot age)
+RETRY_DELAY = datetime.timedelta(minutes=15)
+
+SNAPSHOT_COLUMNS = ["Symbol", "Security", "Sector"]
+
+# Built-in universes and how to read them from Wikipedia
+UNIVERSES = {
+    "S&P 500": {
+        "url": "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies",
+        "columns": {"Symbol": "Symbol", "Security": "Security", "GICS Sector": "Sector"},
+    },
+    "Nasdaq-100": {
+        "url": "https://en.wikipedia.org/wiki/Nasdaq-100",
+        "columns": {"Ticker": "Symbol", "Company": "Security", "GICS Sector": "Sector"},
+    },
+}
+
+_refreshing = set()
+_refresh_lock = threading.Lock()
+
+
+def _universe_dir(universe):
+    return os.path.join(STORE_DIR, re.sub(r"[^a-z0-9]+", "_", universe.lower()).strip("_"))
+
+
+def list_universes():
+    """Returns the built-in universes followed by any saved watchlists."""
+    universes = list(UNIVERSES)
+    if os.path.isdir(STORE_DIR):
+        for entry in sorted(os.listdir(STORE_DIR)):
+            meta_path = os.path.join(STORE_DIR, entry, "meta.json")
+            if os.path.exists(meta_path):
+                with open(meta_path) as f:
+                    name = json.load(f)["name"]
+                if name not in universes:
+                    universes.append(name)
+    return universes
+
+
+def list_versions(universe):
+    """Returns the snapshot versions of a universe, oldest first."""
+    path = _universe_dir(universe)
+    if not os.path.isdir(path):
+        return []
+    return sorted(name[:-4] for name in os.listdir(path) if name.endswith(".csv"))
+
+
+@cached("constituents", max_entries=32)
+def read_snapshot(universe, version):
+    """Reads one stored snapshot version as a DataFrame with Symbol, Security and Sector columns."""
+    return pd.read_csv(
+        os.path.join(_universe_dir(universe), f"{version}.csv"),
+        dtype=str,
+        keep_default_na=False,
+    )
+
+
+def load_snapshot(universe, version=None):
+    """
+    Loads a constituents snapshot (the latest by default) as a DataFrame
+    with Symbol, Security and Sector columns.
+    The repository ships a seed snapshot of each built-in universe, so this only
+    scrapes synchronously if a universe's store was deleted.
+    """
+    versions = list_versions(universe)
+    if not versions:
+        if universe not in UNIVERSES:
+            raise ValueError(f"Unknown universe: {universe}")
+        refresh_universe(universe)
+        versions = list_versions(universe)
+    return read_snapshot(universe, version or versions[-1])
+
+
+def save_snapshot(universe, df):
+    """
+    Stores a new snapshot version if it differs from the latest one.
+    Returns the version that now holds these constituents.
+    """
+    df = df[SNAPSHOT_COLUMNS].fillna("").astype(str).sort_values("Symbol").reset_index(drop=True)
+    versions = list_versions(universe)
+    if versions and read_snapshot(universe, versions[-1]).equals(df):
+        return versions[-1]
+
+    path = _universe_dir(universe)
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"name": universe}, f)
+    # Microseconds keep two saves within the same second from overwriting each other
+    version = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    tmp_path = os.path.join(path, f".{version}.tmp")
+    df.to_csv(tmp_path, index=False)
+    # Readers only ever see complete snapshot files
+    os.replace(tmp_path, os.path.join(path, f"{version}.csv"))
+    return version
+
+
+def save_watchlist(name, symbols):
+    """Saves a custom watchlist, taking company names and sectors from the built-in universes."""
+    known = pd.concat([load_snapshot(universe) for universe in UNIVERSES if list_versions(universe)] or
+                      [pd.DataFrame(columns=SNAPSHOT_COLUMNS)])
+    known = known.drop_duplicates("Symbol").set_index("Symbol")
+    symbols = [symbol.strip().upper() for symbol in symbols if symbol.strip()]
+    df = pd.DataFrame({
+        "Symbol": symbols,
+        "Security": [known["Security"].get(symbol, symbol) for symbol in symbols],
+        "Sector": [known["Sector"].get(symbol, "") for symbol in symbols],
+    })
+    return save_snapshot(name, df)
+
+
+def fetch_universe(universe):
+    """Scrapes the current constituents of a built-in universe from Wikipedia."""
+    source = UNIVERSES[universe]
+    for table in pd.read_html(source["url"]):
+        if all(col in table.columns for col in source["columns"]):
+            return table[list(source["columns"])].rename(columns=source["columns"])
+    raise ValueError(f"No constituents table found for {universe}")
+
+
+def refresh_universe(universe):
+    """
+    Scrapes a built-in universe and stores it as a new version if it changed.
+    Records the check either way, so an unchanged or failed scrape isn't retried at once.
+    """
+    try:
+        version = save_snapshot(universe, fetch_universe(universe))
+    except Exception:
+        state = _read_check_state(universe)
+        _write_check_state(universe, failures=state.get("failures", 0) + 1)
+        raise
+    _write_check_state(universe, failures=0)
+    return version
+
+
+def _check_state_path(universe):
+    # Kept apart from meta.json, which ships with the seed snapshots
+    return os.path.join(_universe_dir(universe), "checked.json")
+
+
+def _read_check_state(universe):
+    try:
+        with open(_check_state_path(universe)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_check_state(universe, failures):
+    path = _check_state_path(universe)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"checked": datetime.datetime.now(datetime.timezone.utc).isoformat(), "failures": failures}, f)
+    os.replace(tmp_path, path)
+
+
+def refresh_due(universe, max_age=MAX_SNAPSHOT_AGE):
+    """
+    Tells whether a built-in universe should be scraped again: its latest snapshot and
+    its last check are both older than max_age, or than the back-off after failed checks.
+    """
+    age = snapshot_age(universe)
+    if age is None:
+        return True
+    state = _read_check_state(universe)
+    if "checked" in state:
+        checked = datetime.datetime.fromisoformat(state["checked"])
+        age = min(age, datetime.datetime.now(datetime.timezone.utc) - checked)
+    failures = state.get("failures", 0)
+    if failures:
+        max_age = min(max_age, RETRY_DELAY * 2 ** (failures - 1))
+    return age >= max_age
+
+
+def snapshot_age(universe):
+    """Returns how old the latest snapshot is, or None if there is none."""
+    versions = list_versions(universe)
+    if not versions:
+        return None
+    # Versions saved before microseconds were added have second precision
+    created = datetime.datetime.strptime(
+        versions[-1], "%Y%m%dT%H%M%S%f" if len(versions[-1]) > 15 else "%Y%m%dT%H%M%S"
+    ).replace(tzinfo=datetime.timezone.utc)
+    return datetime.datetime.now(datetime.timezone.utc) - created
+
+
+def refresh_in_background(universe, max_age=MAX_SNAPSHOT_AGE):
+    """
+    Starts a daemon thread that refreshes a stale built-in universe.
+    Returns True if a refresh was started. Failures keep the existing snapshot and are
+    retried after RETRY_DELAY, doubling per consecutive failure.
+    """
+    if universe not in UNIVERSES or not refresh_due(universe, max_age):
+        return False
+    with _refresh_lock:
+        if universe in _refreshing:
+            return False
+        _refreshing.add(universe)
+
+    def run():
+        try:
+            refresh_universe(universe)
+        except Exception as e:
+            print(f"Refreshing {universe} constituents failed: {e}", file=sys.stderr)
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(universe)
+
+    threading.Thread(target=run, name=f"refresh-{universe}", daemon=True).start()
+    return True
+
+
+def diff_snapshots(universe, old_version=None, new_version=None):
+    """
+    Compares two snapshot versions (the last two by default).
+    Returns a dict of added, removed and changed constituents as DataFrames.
+    """
+    versions = list_versions(universe)
+    if new_version is None:
+        new_version = versions[-1]
+    if old_version is None:
+        old_version = versions[versions.index(new_version) - 1] if versions.index(new_version) > 0 else new_version
+    old = read_snapshot(universe, old_version)
+    new = read_snapshot(universe, new_version)
+
+    merged = old.merge(new, on="Symbol", how="outer", suffixes=("_old", "_new"), indicator=True)
+    changed = merged[
+        (merged["_merge"] == "both") &
+        ((merged["Security_old"] != merged["Security_new"]) | (merged["Sector_old"] != merged["Sector_new"]))
+    ]
+    return {
+        "added": new[new["Symbol"].isin(merged.loc[merged["_merge"] == "right_only", "Symbol"])],
+        "removed": old[old["Symbol"].isin(merged.loc[merged["_merge"] == "left_only", "Symbol"])],
+        "changed": changed.drop(columns="_merge").reset_index(drop=True),
+    }
+
+
+class TickerIndex:
+    """
+    Prefix index over tickers, company names and the words in company names.
+    Falls back to fuzzy matching when no prefix matches.
+    """
+
+    def __init__(self, df):
+        self.symbols = df["Symbol"].tolist()
+        self.names = dict(zip(df["Symbol"], df["Security"]))
+        entries = []
+        for position, (symbol, name) in enumerate(zip(df["Symbol"], df["Security"])):
+            # Rank 0: ticker, 1: full company name, 2: later word of the name
+            entries.append((symbol.lower(), 0, position))
+            entries.append((name.lower(), 1, position))
+            entries.extend((word, 2, position) for word in name.lower().split()[1:])
+        entries.sort()
+        self._keys = [key for key, _, _ in entries]
+        self._entries = entries
+
+    def search(self, query, limit=50):
+        """Returns matching tickers, best matches first."""
+        query = query.strip().lower()
+        if not query:
+            return self.symbols[:limit]
+
+        lo = bisect.bisect_left(self._keys, query)
+        hi = bisect.bisect_left(self._keys, query + "\uffff")
+        matches = self._entries[lo:hi]
+        if not matches:
+            close = set(difflib.get_close_matches(query, self._keys, n=limit or 10, cutoff=0.6))
+            matches = [entry for entry in self._entries if entry[0] in close]
+
+        best = {}
+        for key, rank, position in matches:
+            score = (key != query, rank, len(key))
+            if position not in best or score < best[position]:
+                best[position] = score
+        ranked = sorted(best, key=lambda position: (best[position], position))
+        return [self.symbols[position] for position in ranked[:limit]]
+
+
+@cached("constituents", max_entries=32)
+def _build_index(universe, version):
+    return TickerIndex(read_snapshot(universe, version))
+
+
+def get_search_index(universe):
+    """Returns the search index for the latest snapshot of a universe."""
+    versions = list_versions(universe)
+    if not versions:
+        load_snapshot(universe)
+        versions = list_versions(universe)
+    return _build_index(universe, versions[-1])
+
+
+if __name__ == "__main__":
+    command, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("refresh", [])
+    if command == "refresh":
+        for universe in args or UNIVERSES:
+            print(f"{universe}: {refresh_universe(universe)}")
+    elif command == "diff":
+        for kind, rows in diff_snapshots(*args).items():
+            print(f"{kind} ({len(rows)})")
+            if len(rows):
+                print(rows.to_string(index=False))
+    else:
+        sys.exit(__doc__)
@@ -1,69 +1,70 @@
-import yfinance as yf
-import streamlit as st
-import pandas as pd
+import os
+from cache import cached
+from constituents import load_snapshot
+from normalize import normalize_ohlcv, adjust_prices, check_quality
+from price_store import get_price_store
 
-@st.cache_data
 def get_sp500_components():
-    """Fetches the list of S&P 500 companies from Wikipedia."""
-    df = pd.read_html("https://en.wikipedia.org/wiki/List_of_S%26P_500_companies")
-    df = df[0]
+    """Returns the S&P 500 tickers and a ticker -> company dict from the local constituents store."""
+    df = load_snapshot("S&P 500")
     tickers = df["Symbol"].to_list()
     tickers_companies_dict = dict(zip(df["Symbol"], df["Security"]))
     return tickers, tickers_companies_dict
 
-@st.cache_data
-def load_data(symbol, start, end):
-    """
-    Loads historical stock data for a given symbol and date range.
-    Handles MultiIndex columns and standardizes column names.
-    """
-    data = yf.download(symbol, start, end)
+def yahoo_download(symbol, start, end):
+    """Downloads unadjusted daily bars with dividend and split actions from Yahoo Finance."""
+    import yfinance as yf  # deferred: importing yfinance is slow and only needed on a cache miss
 
-    # Fix for MultiIndex columns - flatten the columns if they are MultiIndex
-    if isinstance(data.columns, pd.MultiIndex):
-        data.columns = [' '.join(col).strip() for col in data.columns.values]
+    return yf.download(symbol, start, end, auto_adjust=False, actions=True, progress=False)
 
-    # Ensure standard column names (Open, High, Low, Close, Volume)
-    # Map common variations to standard names
-    standard_cols = {
-        'Open': 'Open',
-        'High': 'High',
-        'Low': 'Low',
-        'Close': 'Close',
-        'Volume': 'Volume',
-        'Adj Close': 'Adj Close'
-    }
+# Where load_data gets its raw bars; see set_data_provider
+_data_provider = yahoo_download
 
-    # Create a mapping for the actual columns in the dataframe
-    actual_mapping = {}
-
-    # First, try to find exact matches
-    for std_col in standard_cols:
-        if std_col in data.columns:
-            actual_mapping[std_col] = std_col
+def set_data_provider(provider):
+    """
+    Routes load_data through another bar source, such as a replay.ReplayProvider.
+    A provider is called as provider(symbol, start, end) and returns a raw OHLCV frame.
+    It may expose `version` (changes whenever new bars are available) and
+    `split_adjusted` (False if prices still need back-adjusting for splits).
+    """
+    global _data_provider
+    _data_provider = provider
+    _load_data.clear()
 
-    # If we don't have all standard columns, look for ticker-specific columns
-    # (like "Open MMM", "Close MMM", etc.)
-    if len(actual_mapping) < len(standard_cols):
-        for col in data.columns:
-            for std_col in standard_cols:
-                # Check if column starts with standard name (e.g., "Open MMM" starts with "Open")
-                if col.startswith(std_col + " ") or col == std_col:
-                    actual_mapping[col] = std_col
-                # Also check lowercase variations
-                elif col.lower().startswith(std_col.lower() + " ") or col.lower() == std_col.lower():
-                    actual_mapping[col] = std_col
+def get_data_provider():
+    """Returns the active bar source."""
+    return _data_provider
 
-    # Rename columns if needed
-    if actual_mapping:
-        data = data.rename(columns=actual_mapping)
+def fetch_data(symbol, start, end):
+    """
+    Fetches stock data for a symbol (or a list of symbols) and date range, without caching.
+    Returns a normalized, dividend-adjusted OHLCV frame; several symbols give a
+    (field, ticker) panel. The data-quality report is kept in df.attrs["quality"].
+    """
+    data = _data_provider(symbol, start, end)
+    # Yahoo prices and volumes are already split-adjusted; Adj Close adds dividends
+    df = adjust_prices(normalize_ohlcv(data), split_adjusted=getattr(_data_provider, "split_adjusted", True))
+    df.attrs["quality"] = check_quality(df)
+    return df
 
-    # Debug info
-    st.sidebar.write("Available columns:", ", ".join(data.columns))
+@cached("prices", max_bytes=256 * 1024 * 1024, max_entries=200, ttl=60 * 60)
+def _load_data(symbol, start, end, provider_version):
+    return fetch_data(symbol, start, end)
 
-    return data
+def load_data(symbol, start, end):
+    """
+    Loads historical stock data for a symbol (or a list of symbols) and date range.
+    Same as fetch_data, but cached until the provider has new bars.
+    Single Yahoo tickers held in the shared price store (see price_store.py) are served
+    as zero-copy views of it instead of a per-process cached copy, when the store covers
+    all of [start, end); other ranges are downloaded.
+    """
+    if isinstance(symbol, str) and _data_provider is yahoo_download:
+        store = get_price_store()
+        if store is not None and symbol in store and store.covers(start, end):
+            return store.frame(symbol, start, end)
+    return _load_data(symbol, start, end, getattr(_data_provider, "version", None))
 
-@st.cache_data
-def convert_df_to_csv(df):
-    """Converts a DataFrame to a CSV file for download."""
-    return df.to_csv().encode("utf-8")
\ No newline at end of file
+if os.environ.get("STOCK_DATA_PROVIDER") == "replay":
+    from replay import replay_from_env
+    set_data_provider(replay_from_env())
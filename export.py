@@ -0,0 +1,167 @@
+import gzip
+import tempfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_loader import fetch_data
+from indicators import (
+    calculate_macd, calculate_atr, calculate_obv,
+    calculate_stochastic, calculate_rsi, calculate_sma,
+    calculate_bollinger_bands, calculate_moving_average, calculate_vwap,
+    calculate_adx, calculate_ichimoku, calculate_keltner_channels,
+    calculate_psar, calculate_williams_r, calculate_cci, calculate_mfi
+)
+
+# Rows converted per chunk; bounds the size of any intermediate buffer
+CHUNK_ROWS = 50_000
+
+# Exports larger than this are spooled to disk instead of memory
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+# Largest export offered for download. st.download_button reads the whole file into the
+# server's memory, whatever is passed to it
+MAX_EXPORT_BYTES = 200 * 1024 * 1024
+
+class ExportTooLargeError(ValueError):
+    """Raised when an export grows past its size limit."""
+
+
+EXPORT_FORMATS = {
+    "CSV": {"extension": "csv", "mime": "text/csv"},
+    "CSV (gzip)": {"extension": "csv.gz", "mime": "application/gzip"},
+    "Parquet": {"extension": "parquet", "mime": "application/vnd.apache.parquet"},
+    "Arrow IPC": {"extension": "arrow", "mime": "application/vnd.apache.arrow.file"},
+}
+
+
+def add_indicator_columns(df, indicator_params):
+    """Adds the indicator columns selected in the sidebar to a price DataFrame."""
+    if indicator_params["sma_flag"]:
+        df = calculate_sma(df, indicator_params["sma_periods"])
+    if indicator_params["bb_flag"]:
+        df = calculate_bollinger_bands(df, indicator_params["bb_periods"], indicator_params["bb_std"])
+    if indicator_params["rsi_flag"]:
+        df = calculate_rsi(df, indicator_params["rsi_periods"])
+    if indicator_params["macd_flag"]:
+        df = calculate_macd(df, indicator_params["macd_fast"], indicator_params["macd_slow"], indicator_params["macd_signal"])
+    if indicator_params["atr_flag"]:
+        df = calculate_atr(df, indicator_params["atr_period"])
+    if indicator_params["obv_flag"]:
+        df = calculate_obv(df)
+    if indicator_params["stoch_flag"]:
+        df = calculate_stochastic(df, indicator_params["stoch_k"], indicator_params["stoch_d"])
+    if indicator_params["ma_flag"]:
+        df = calculate_moving_average(df, indicator_params["ma_periods"], indicator_params["ma_type"])
+    if indicator_params["vwap_flag"]:
+        df = calculate_vwap(df, indicator_params["vwap_period"] or None)
+    if indicator_params["adx_flag"]:
+        df = calculate_adx(df, indicator_params["adx_period"])
+    if indicator_params["ichimoku_flag"]:
+        df = calculate_ichimoku(df, indicator_params["ichimoku_conversion"], indicator_params["ichimoku_base"], indicator_params["ichimoku_span_b"])
+    if indicator_params["keltner_flag"]:
+        df = calculate_keltner_channels(df, indicator_params["keltner_periods"], indicator_params["keltner_atr"], indicator_params["keltner_multiplier"])
+    if indicator_params["psar_flag"]:
+        df = calculate_psar(df, indicator_params["psar_step"], indicator_params["psar_max_step"])
+    if indicator_params["willr_flag"]:
+        df = calculate_williams_r(df, indicator_params["willr_period"])
+    if indicator_params["cci_flag"]:
+        df = calculate_cci(df, indicator_params["cci_period"])
+    if indicator_params["mfi_flag"]:
+        df = calculate_mfi(df, indicator_params["mfi_period"])
+    return df
+
+
+def iter_ticker_frames(tickers, start, end, indicator_params=None, columns=None):
+    """
+    Yields one DataFrame per ticker, with a leading Ticker column.
+    `columns` restricts the price columns that are exported.
+    Only one ticker's data is held at a time and the interactive price cache is bypassed.
+    """
+    for ticker in tickers:
+        df = fetch_data(ticker, start, end)
+        if df.empty:
+            continue
+        price_cols = df.columns
+        if indicator_params is not None:
+            df = add_indicator_columns(df, indicator_params)
+        if columns is not None:
+            # The column filter applies to price columns; indicator columns are always kept
+            df = df.drop(columns=[col for col in price_cols if col not in columns])
+        df.insert(0, "Ticker", ticker)
+        yield df
+
+
+def _iter_chunks(frames, chunk_rows):
+    """Splits a stream of DataFrames into row chunks with a consistent column layout."""
+    columns = None
+    for df in frames:
+        if columns is None:
+            columns = df.columns
+        else:
+            df = df.reindex(columns=columns)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+
+def _write_csv(chunks, sink, compress):
+    stream = gzip.GzipFile(fileobj=sink, mode="wb") if compress else sink
+    header = True
+    for chunk in chunks:
+        stream.write(chunk.to_csv(header=header).encode("utf-8"))
+        header = False
+    if compress:
+        stream.close()
+
+
+def _write_arrow(chunks, sink, fmt):
+    writer = None
+    schema = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=True)
+        if writer is None:
+            schema = table.schema
+            if fmt == "Parquet":
+                writer = pq.ParquetWriter(sink, schema, compression="zstd")
+            else:
+                writer = pa.ipc.new_file(sink, schema)
+        writer.write_table(table)
+    if writer is not None:
+        writer.close()
+
+
+def write_export(frames, fmt, sink, chunk_rows=CHUNK_ROWS):
+    """Writes a stream of DataFrames to a binary sink in the requested format."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    chunks = _iter_chunks(frames, chunk_rows)
+    if fmt in ("CSV", "CSV (gzip)"):
+        _write_csv(chunks, sink, compress=fmt == "CSV (gzip)")
+    else:
+        _write_arrow(chunks, sink, fmt)
+
+
+def _until_size(frames, sink, max_bytes):
+    """Passes frames through until the sink has grown past max_bytes, so the writer still closes cleanly."""
+    for df in frames:
+        if sink.tell() > max_bytes:
+            return
+        yield df
+
+
+def export_to_file(frames, fmt, chunk_rows=CHUNK_ROWS, max_bytes=MAX_EXPORT_BYTES):
+    """
+    Writes an export to a spooled temporary file and returns it rewound.
+    Small exports stay in memory while they are written, large ones roll over to disk.
+    Raises ExportTooLargeError when the export grows past max_bytes (checked between tickers).
+    """
+    sink = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    try:
+        write_export(_until_size(frames, sink, max_bytes), fmt, sink, chunk_rows)
+        if sink.tell() > max_bytes:
+            raise ExportTooLargeError(f"Export is larger than {max_bytes // 1024 ** 2} MB")
+    except Exception:
+        sink.close()
+        raise
+    sink.seek(0)
+    return sink
@@ -0,0 +1,49 @@
+"""
+Reports how long the app's modules take to import.
+
+Usage: python import_profile.py [module ...]
+"""
+import subprocess
+import sys
+
+APP_MODULES = ["cache", "data_loader", "indicators", "plotting", "export", "finance_team"]
+
+
+def profile_imports(modules, top=10):
+    """
+    Imports the modules in a fresh interpreter with -X importtime.
+    Returns {module: (cumulative ms, [(dependency, ms), ...])} with the slowest direct imports of each.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    report = {}
+    children = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nesting is shown by two extra spaces per level; children are printed before their parent
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        ms = int(cumulative) / 1000
+        if depth == 1:
+            children.append((name.strip(), ms))
+        elif depth == 0:
+            if name.strip() in modules:
+                report[name.strip()] = (ms, sorted(children, key=lambda item: item[1], reverse=True)[:top])
+            children = []
+    return report
+
+
+if __name__ == "__main__":
+    report = profile_imports(sys.argv[1:] or APP_MODULES)
+    print(f"Total import time: {sum(ms for ms, _ in report.values()):.1f} ms")
+    for module, (ms, slowest) in sorted(report.items(), key=lambda item: item[1][0], reverse=True):
+        print(f"{ms:10.1f} ms  {module}")
+        for name, child_ms in slowest:
+            print(f"{child_ms:10.1f} ms    {name}")
@@ -1,16 +1,73 @@
 import pandas as pd
 import numpy as np
+import kernels
+
+# The *_values functions work on a Series or on a time x ticker DataFrame alike,
+# and on the equivalent NumPy arrays (e.g. price_store views), which are wrapped without copying.
+
+def _as_pandas(values):
+    """Wraps a 1-D array as a Series and a 2-D (time, ticker) array as a DataFrame."""
+    if isinstance(values, np.ndarray):
+        return pd.Series(values, copy=False) if values.ndim == 1 else pd.DataFrame(values, copy=False)
+    return values
+
+def _like(values, array):
+    """Wraps a result array with the index (and columns) of the input."""
+    if isinstance(values, pd.DataFrame):
+        return pd.DataFrame(array, index=values.index, columns=values.columns)
+    return pd.Series(array, index=values.index)
+
+def _ewm(values, alpha):
+    """Exponential smoothing through the kernels backend (see kernels.py)."""
+    result = kernels.ewm_mean(values.to_numpy(dtype="float64"), alpha)
+    return _like(values, result if isinstance(values, pd.DataFrame) else result[:, 0])
+
+def macd_values(close, fast_period=12, slow_period=26, signal_period=9):
+    """Returns the fast EMA, slow EMA, MACD, signal line and histogram."""
+    close = _as_pandas(close)
+    ema_fast = _ewm(close, 2 / (fast_period + 1))
+    ema_slow = _ewm(close, 2 / (slow_period + 1))
+    macd = ema_fast - ema_slow
+    signal = _ewm(macd, 2 / (signal_period + 1))
+    return ema_fast, ema_slow, macd, signal, macd - signal
+
+def rsi_values(close, period=14):
+    """Returns the Relative Strength Index."""
+    delta = _as_pandas(close).diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+
+    avg_gain = gain.rolling(window=period).mean()
+    avg_loss = loss.rolling(window=period).mean()
+
+    # Avoid division by zero
+    avg_loss = avg_loss.replace(0, 0.00001)
+
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+def stochastic_values(high, low, close, k_period=14, d_period=3):
+    """Returns the lowest low, highest high, %K and %D."""
+    high, low, close = _as_pandas(high), _as_pandas(low), _as_pandas(close)
+    lowest_low = low.rolling(window=k_period).min()
+    highest_high = high.rolling(window=k_period).max()
+    k = 100 * ((close - lowest_low) / (highest_high - lowest_low))
+    return lowest_low, highest_high, k, k.rolling(window=d_period).mean()
+
+def bollinger_values(close, period=20, std_dev=2):
+    """Returns the middle band (SMA), rolling standard deviation, upper and lower band."""
+    close = _as_pandas(close)
+    sma = close.rolling(window=period).mean()
+    std = close.rolling(window=period).std()
+    return sma, std, sma + (std * std_dev), sma - (std * std_dev)
 
 def calculate_macd(df, fast_period=12, slow_period=26, signal_period=9):
     """Calculates MACD, MACD Signal, and MACD Histogram."""
     if 'Close' not in df.columns:
         return df
 
-    df[f'EMA_{fast_period}'] = df['Close'].ewm(span=fast_period, adjust=False).mean()
-    df[f'EMA_{slow_period}'] = df['Close'].ewm(span=slow_period, adjust=False).mean()
-    df['MACD'] = df[f'EMA_{fast_period}'] - df[f'EMA_{slow_period}']
-    df['MACD_Signal'] = df['MACD'].ewm(span=signal_period, adjust=False).mean()
-    df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
+    (df[f'EMA_{fast_period}'], df[f'EMA_{slow_period}'], df['MACD'],
+     df['MACD_Signal'], df['MACD_Histogram']) = macd_values(df['Close'], fast_period, slow_period, signal_period)
     return df
 
 def calculate_atr(df, period=14):
@@ -49,10 +106,9 @@ def calculate_stochastic(df, k_period=14, d_period=3):
     if not all(col in df.columns for col in ['High', 'Low', 'Close']):
         return df
 
-    df['Lowest_Low'] = df['Low'].rolling(window=k_period).min()
-    df['Highest_High'] = df['High'].rolling(window=k_period).max()
-    df['%K'] = 100 * ((df['Close'] - df['Lowest_Low']) / (df['Highest_High'] - df['Lowest_Low']))
-    df['%D'] = df['%K'].rolling(window=d_period).mean()
+    df['Lowest_Low'], df['Highest_High'], df['%K'], df['%D'] = stochastic_values(
+        df['High'], df['Low'], df['Close'], k_period, d_period
+    )
     return df
 
 def calculate_rsi(df, period=14):
@@ -60,18 +116,7 @@ def calculate_rsi(df, period=14):
     if 'Close' not in df.columns:
         return df
 
-    delta = df['Close'].diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
-
-    # Avoid division by zero
-    avg_loss = avg_loss.replace(0, 0.00001)
-
-    rs = avg_gain / avg_loss
-    df['RSI'] = 100 - (100 / (1 + rs))
+    df['RSI'] = rsi_values(df['Close'], period)
     return df
 
 def calculate_sma(df, period):
@@ -85,8 +130,217 @@ def calculate_bollinger_bands(df, period=20, std_dev=2):
     """Calculates Bollinger Bands (Middle, Upper, Lower)."""
     if 'Close' not in df.columns:
         return df
-    df = calculate_sma(df, period) # Ensure SMA is calculated
-    df[f'STD_{period}'] = df['Close'].rolling(window=period).std()
-    df['Upper_Band'] = df[f'SMA_{period}'] + (df[f'STD_{period}'] * std_dev)
-    df['Lower_Band'] = df[f'SMA_{period}'] - (df[f'STD_{period}'] * std_dev)
-    return df
\ No newline at end of file
+    (df[f'SMA_{period}'], df[f'STD_{period}'],
+     df['Upper_Band'], df['Lower_Band']) = bollinger_values(df['Close'], period, std_dev)
+    return df
+
+def _seeded_ewm(values, alpha, period):
+    """
+    Exponential smoothing seeded with the SMA of the first `period` valid values,
+    as in Wilder's and TA-Lib's definitions. Each ticker is seeded from its own first bars.
+    """
+    count = values.notna().cumsum()
+    seeded = values.where(count > period, values.rolling(window=period).mean().where(count == period))
+    return _ewm(seeded, alpha)
+
+def ema_values(values, period):
+    """Returns the exponential moving average (alpha = 2 / (period + 1))."""
+    return _seeded_ewm(_as_pandas(values), 2 / (period + 1), period)
+
+def wilder_values(values, period):
+    """Returns Wilder's smoothed moving average (alpha = 1 / period), used by ATR, ADX and RSI."""
+    return _seeded_ewm(_as_pandas(values), 1 / period, period)
+
+def wma_values(values, period):
+    """
+    Returns the linearly weighted moving average in O(n): window sums of x and of i * x
+    are differences of running sums, and sum((i - start) * x) over a window is the WMA numerator.
+    Windows with a missing value give NaN.
+    """
+    values = _as_pandas(values)
+    array = values.to_numpy(dtype="float64")
+    array = array.reshape(len(array), values.shape[1] if values.ndim == 2 else 1)
+    missing = np.isnan(array)
+    filled = np.where(missing, 0.0, array)
+    position = np.arange(1, len(array) + 1, dtype="float64")[:, None]
+    sums = [np.concatenate([np.zeros((1, array.shape[1])), np.cumsum(part, axis=0)])
+            for part in (filled, position * filled, missing.astype("float64"))]
+    x_sum, ix_sum, gaps = (total[period:] - total[:-period] for total in sums)
+    start = np.arange(len(x_sum), dtype="float64")[:, None]
+    result = np.full(array.shape, np.nan)
+    result[period - 1:] = np.where(gaps > 0, np.nan, (ix_sum - start * x_sum) / (period * (period + 1) / 2))
+    return _like(values, result if isinstance(values, pd.DataFrame) else result[:, 0])
+
+def hma_values(values, period):
+    """Returns the Hull moving average: WMA(2 * WMA(n / 2) - WMA(n), sqrt(n))."""
+    values = _as_pandas(values)
+    raw = 2 * wma_values(values, max(period // 2, 1)) - wma_values(values, period)
+    return wma_values(raw, max(int(np.sqrt(period)), 1))
+
+MOVING_AVERAGES = {
+    "EMA": ema_values,
+    "WMA": wma_values,
+    "HMA": hma_values,
+    "Wilder": wilder_values,
+}
+
+def true_range_values(high, low, close):
+    """Returns the true range; the first bar uses High - Low."""
+    high, low, close = _as_pandas(high), _as_pandas(low), _as_pandas(close)
+    prev_close = close.shift(1)
+    return np.fmax(high - low, np.fmax((high - prev_close).abs(), (low - prev_close).abs()))
+
+def atr_values(high, low, close, period=14):
+    """Returns Wilder's Average True Range."""
+    return wilder_values(true_range_values(high, low, close), period)
+
+def vwap_values(high, low, close, volume, period=None):
+    """
+    Returns the volume-weighted average typical price, anchored at the first bar,
+    or over a rolling window of `period` bars.
+    """
+    high, low, close, volume = (_as_pandas(x) for x in (high, low, close, volume))
+    typical = (high + low + close) / 3
+    if period is None:
+        return (typical * volume).cumsum() / volume.cumsum()
+    return (typical * volume).rolling(window=period).sum() / volume.rolling(window=period).sum()
+
+def adx_values(high, low, close, period=14):
+    """Returns +DI, -DI and the Average Directional Index, all with Wilder smoothing."""
+    high, low, close = _as_pandas(high), _as_pandas(low), _as_pandas(close)
+    up = high.diff()
+    down = -low.diff()
+    plus_dm = up.where((up > down) & (up > 0), 0).where(up.notna())
+    minus_dm = down.where((down > up) & (down > 0), 0).where(down.notna())
+    # The first bar has no directional movement, so smoothing starts on the second
+    tr = true_range_values(high, low, close).where(close.shift(1).notna())
+    atr = wilder_values(tr, period)
+    plus_di = 100 * wilder_values(plus_dm, period) / atr
+    minus_di = 100 * wilder_values(minus_dm, period) / atr
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
+    return plus_di, minus_di, wilder_values(dx, period)
+
+def ichimoku_values(high, low, close, conversion_period=9, base_period=26, span_b_period=52):
+    """
+    Returns the conversion line (Tenkan-sen), base line (Kijun-sen), leading spans A and B
+    (plotted `base_period` bars ahead) and the lagging span (close plotted that far back).
+    """
+    high, low, close = _as_pandas(high), _as_pandas(low), _as_pandas(close)
+
+    def midpoint(period):
+        return (high.rolling(window=period).max() + low.rolling(window=period).min()) / 2
+
+    conversion = midpoint(conversion_period)
+    base = midpoint(base_period)
+    span_a = ((conversion + base) / 2).shift(base_period)
+    span_b = midpoint(span_b_period).shift(base_period)
+    return conversion, base, span_a, span_b, close.shift(-base_period)
+
+def keltner_values(high, low, close, period=20, atr_period=10, multiplier=2):
+    """Returns the Keltner middle line (EMA of close), upper and lower channel (± multiplier x ATR)."""
+    middle = ema_values(close, period)
+    atr = atr_values(high, low, close, atr_period)
+    return middle, middle + multiplier * atr, middle - multiplier * atr
+
+def psar_values(high, low, step=0.02, max_step=0.2):
+    """
+    Returns Wilder's Parabolic SAR, starting in an uptrend on each ticker's first bar.
+    Each SAR depends on the previous one, so it is computed by a recursive kernel (see kernels.py).
+    """
+    high, low = _as_pandas(high), _as_pandas(low)
+    result = kernels.psar(high.to_numpy(dtype="float64"), low.to_numpy(dtype="float64"), step, max_step)
+    return _like(high, result if isinstance(high, pd.DataFrame) else result[:, 0])
+
+def williams_r_values(high, low, close, period=14):
+    """Returns Williams %R (-100 at the period low, 0 at the period high)."""
+    high, low, close = _as_pandas(high), _as_pandas(low), _as_pandas(close)
+    highest_high = high.rolling(window=period).max()
+    lowest_low = low.rolling(window=period).min()
+    return -100 * (highest_high - close) / (highest_high - lowest_low)
+
+def cci_values(high, low, close, period=20):
+    """Returns the Commodity Channel Index, using the mean absolute deviation of the typical price."""
+    high, low, close = _as_pandas(high), _as_pandas(low), _as_pandas(close)
+    typical = (high + low + close) / 3
+    sma = typical.rolling(window=period).mean()
+    mean_deviation = kernels.mean_deviation(typical.to_numpy(dtype="float64"), period)
+    mean_deviation = _like(typical, mean_deviation if isinstance(typical, pd.DataFrame) else mean_deviation[:, 0])
+    return (typical - sma) / (0.015 * mean_deviation)
+
+def mfi_values(high, low, close, volume, period=14):
+    """Returns the Money Flow Index."""
+    high, low, close, volume = (_as_pandas(x) for x in (high, low, close, volume))
+    typical = (high + low + close) / 3
+    flow = typical * volume
+    change = typical.diff()
+    positive = flow.where(change > 0, 0).rolling(window=period).sum()
+    negative = flow.where(change < 0, 0).rolling(window=period).sum()
+    return 100 * positive / (positive + negative)
+
+def calculate_moving_average(df, period, kind="EMA"):
+    """Calculates an EMA, WMA, HMA or Wilder moving average of Close as column f'{kind}_{period}'."""
+    if 'Close' not in df.columns:
+        return df
+    df[f'{kind}_{period}'] = MOVING_AVERAGES[kind](df['Close'], period)
+    return df
+
+def calculate_vwap(df, period=None):
+    """Calculates the Volume-Weighted Average Price (anchored, or rolling over `period` bars)."""
+    if not all(col in df.columns for col in ['High', 'Low', 'Close', 'Volume']):
+        return df
+    df['VWAP'] = vwap_values(df['High'], df['Low'], df['Close'], df['Volume'], period)
+    return df
+
+def calculate_adx(df, period=14):
+    """Calculates the Directional Movement Index (+DI, -DI) and ADX."""
+    if not all(col in df.columns for col in ['High', 'Low', 'Close']):
+        return df
+    df['+DI'], df['-DI'], df['ADX'] = adx_values(df['High'], df['Low'], df['Close'], period)
+    return df
+
+def calculate_ichimoku(df, conversion_period=9, base_period=26, span_b_period=52):
+    """Calculates the Ichimoku Cloud lines."""
+    if not all(col in df.columns for col in ['High', 'Low', 'Close']):
+        return df
+    (df['Tenkan_Sen'], df['Kijun_Sen'], df['Senkou_Span_A'],
+     df['Senkou_Span_B'], df['Chikou_Span']) = ichimoku_values(
+        df['High'], df['Low'], df['Close'], conversion_period, base_period, span_b_period
+    )
+    return df
+
+def calculate_keltner_channels(df, period=20, atr_period=10, multiplier=2):
+    """Calculates Keltner Channels (Middle, Upper, Lower)."""
+    if not all(col in df.columns for col in ['High', 'Low', 'Close']):
+        return df
+    df['Keltner_Middle'], df['Keltner_Upper'], df['Keltner_Lower'] = keltner_values(
+        df['High'], df['Low'], df['Close'], period, atr_period, multiplier
+    )
+    return df
+
+def calculate_psar(df, step=0.02, max_step=0.2):
+    """Calculates the Parabolic SAR."""
+    if not all(col in df.columns for col in ['High', 'Low']):
+        return df
+    df['PSAR'] = psar_values(df['High'], df['Low'], step, max_step)
+    return df
+
+def calculate_williams_r(df, period=14):
+    """Calculates Williams %R."""
+    if not all(col in df.columns for col in ['High', 'Low', 'Close']):
+        return df
+    df['Williams_%R'] = williams_r_values(df['High'], df['Low'], df['Close'], period)
+    return df
+
+def calculate_cci(df, period=20):
+    """Calculates the Commodity Channel Index (CCI)."""
+    if not all(col in df.columns for col in ['High', 'Low', 'Close']):
+        return df
+    df['CCI'] = cci_values(df['High'], df['Low'], df['Close'], period)
+    return df
+
+def calculate_mfi(df, period=14):
+    """Calculates the Money Flow Index (MFI)."""
+    if not all(col in df.columns for col in ['High', 'Low', 'Close', 'Volume']):
+        return df
+    df['MFI'] = mfi_values(df['High'], df['Low'], df['Close'], df['Volume'], period)
+    return df
@@ -0,0 +1,283 @@
+"""
+Local fast path in front of the Fintelligence agent team.
+
+Simple lookups about one company ("What is the current stock price of apple?",
+"How much did MSFT move this month?", "RSI of nvidia", "market cap of AAPL") are answered
+from the cached price data and indicators.py in milliseconds. Open-ended questions
+(analysis, comparisons, news, advice) and anything not recognized go to the team.
+Every routing decision is logged to the "intent_router" logger.
+"""
+import datetime
+import logging
+import re
+import time
+
+from cache import cached
+from constituents import list_universes, list_versions, read_snapshot
+from data_loader import load_data
+from indicators import (
+    calculate_rsi, calculate_macd, calculate_sma, calculate_moving_average,
+    calculate_bollinger_bands, calculate_atr, calculate_stochastic, calculate_adx,
+    calculate_williams_r, calculate_cci, calculate_mfi, calculate_vwap, calculate_psar
+)
+
+logger = logging.getLogger("intent_router")
+
+# Questions that need judgement, context or several sources always go to the team
+ESCALATE = re.compile(
+    r"\b(why|should|compare|comparison|versus|vs|analy[sz]e|analysis|recommend\w*|forecast|predict\w*|"
+    r"outlook|news|risks?|explain|strategy|buy|sell|hold|undervalued|overvalued|earnings|"
+    r"dividends?|opinion|think|summari[sz]e|statements?|ratios?|fundamentals?|sentiment|tell me about|"
+    # Anything beyond the latest bars: highs and lows, derivatives, targets
+    r"highs?|lows?|all[- ]time|52[- ]weeks?|options?|calls?|puts?|targets?|"
+    # Questions about a particular past date or period: years, month names, numeric dates, past tense
+    r"(19|20)\d{2}|jan(uary)?|feb(ruary)?|march|mar|apr(il)?|may|june?|july?|aug(ust)?|sept?(ember)?|"
+    r"oct(ober)?|nov(ember)?|dec(ember)?|\d{1,2}[/-]\d{1,2}([/-]\d{2,4})?|yesterday|ago|was|were|historical|history)\b"
+)
+
+MARKET_CAP = re.compile(r"\bmarket\s*cap(italization|italisation)?\b|\bworth\b|\bvaluation\b")
+CHANGE = re.compile(r"\b(change[ds]?|move[ds]?|moving|perform\w*|returns?|gain(ed|s)?|los[et]|up or down|how (much|far) (is|has|did) \S+ (risen|fallen|dropped|climbed))\b")
+PRICE = re.compile(r"\b(price|quote|trading at|trade at|closed? at|closing|last close|how much is)\b")
+
+# Look-back of each change period, in bars
+CHANGE_PERIODS = [
+    (re.compile(r"\b(ytd|year[- ]to[- ]date)\b"), "year to date", None),
+    (re.compile(r"\b(year|12 months|1y|annual)\b"), "1 year", 252),
+    (re.compile(r"\b(quarter|3 months|three months)\b"), "3 months", 63),
+    (re.compile(r"\b(month|mtd|30 days)\b"), "1 month", 21),
+    (re.compile(r"\b(week|5 days|wtd)\b"), "1 week", 5),
+]
+
+# Indicator -> (pattern, default period)
+INDICATORS = {
+    "rsi": (re.compile(r"\brsi\b|relative strength"), 14),
+    "macd": (re.compile(r"\bmacd\b"), None),
+    "bollinger": (re.compile(r"\bbollinger\b"), 20),
+    "stochastic": (re.compile(r"\bstoch(astic)?\b"), 14),
+    "adx": (re.compile(r"\b(adx|dmi)\b|directional (movement|index)"), 14),
+    "williams": (re.compile(r"\bwilliams\b|%r\b"), 14),
+    "cci": (re.compile(r"\bcci\b|commodity channel"), 20),
+    "mfi": (re.compile(r"\bmfi\b|money flow"), 14),
+    "atr": (re.compile(r"\batr\b|average true range"), 14),
+    "vwap": (re.compile(r"\bvwap\b"), None),
+    "psar": (re.compile(r"\b(psar|parabolic)\b"), None),
+    "ema": (re.compile(r"\bema\b|exponential moving average"), 20),
+    "sma": (re.compile(r"\b(sma|moving average|\d+[- ]day average)\b"), 20),
+}
+
+# Words dropped from company names when building name aliases
+NAME_NOISE = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "companies", "ltd", "plc",
+    "holdings", "holding", "group", "class", "the", "sa", "ag", "nv", "se", "lp", "a", "b", "c",
+}
+
+# Calendar days of history loaded for a lookup: enough for a 1-year change and indicator warm-up
+HISTORY_DAYS = 2 * 365
+
+
+def _words(text):
+    return re.findall(r"[a-z0-9&]+", re.sub(r"['’]s\b", "", text.lower()))
+
+
+@cached("constituents", max_entries=32)
+def _build_aliases(snapshots):
+    """
+    Maps tickers and lower-case company names (with and without suffixes like Inc.)
+    to symbols, from (universe, version) snapshots. Tickers of four letters or more
+    also match in lower case; shorter ones are too often ordinary words.
+    """
+    symbols, names = set(), {}
+    for universe, version in snapshots:
+        df = read_snapshot(universe, version)
+        for symbol, security in zip(df["Symbol"], df["Security"]):
+            symbols.add(symbol)
+            if len(symbol) >= 4 and symbol.isalpha():
+                names.setdefault(symbol.lower(), symbol)
+            words = _words(security)
+            core = [word for word in words if word not in NAME_NOISE]
+            for alias in {" ".join(words), " ".join(core)}:
+                if alias:
+                    names.setdefault(alias, symbol)
+    return symbols, names
+
+
+def _aliases():
+    snapshots = tuple(
+        (universe, versions[-1])
+        for universe in list_universes()
+        if (versions := list_versions(universe))
+    )
+    return _build_aliases(snapshots)
+
+
+def find_tickers(prompt):
+    """
+    Returns the symbols a prompt mentions. Tickers count when written in capitals
+    (two letters or more) or with a $ prefix, so "it", "all" or "A" are not read as
+    tickers; in an all-caps prompt only $ tickers count. Company names match
+    case-insensitively, longest name first.
+    """
+    symbols, names = _aliases()
+    found = []
+    for token in re.findall(r"\$?\b[A-Z][A-Z0-9.\-]{0,5}", prompt):
+        symbol = token.lstrip("$").rstrip(".")
+        explicit = token.startswith("$")
+        if symbol in symbols and (explicit or (len(symbol) > 1 and not prompt.isupper())):
+            found.append(symbol)
+    words = _words(prompt)
+    position = 0
+    while position < len(words):
+        for length in range(min(5, len(words) - position), 0, -1):
+            symbol = names.get(" ".join(words[position:position + length]))
+            if symbol:
+                found.append(symbol)
+                position += length - 1
+                break
+        position += 1
+    return list(dict.fromkeys(found))
+
+
+def _period(text, default):
+    """First number in the prompt that looks like a look-back period."""
+    for number in re.findall(r"\b(\d{1,3})\b", text):
+        if 1 < int(number) <= 400:
+            return int(number)
+    return default
+
+
+def classify(prompt):
+    """
+    Decides how to handle a prompt. Returns (intent, ticker, params) for a simple
+    lookup, or (None, None, {"reason": ...}) when it should go to the team.
+    """
+    text = prompt.lower()
+    if match := ESCALATE.search(text):
+        return None, None, {"reason": f"open-ended ({match.group(0)})"}
+    tickers = find_tickers(prompt)
+    if len(tickers) != 1:
+        return None, None, {"reason": f"{len(tickers)} companies mentioned"}
+    ticker = tickers[0]
+
+    if MARKET_CAP.search(text):
+        return "market_cap", ticker, {}
+    for name, (pattern, default_period) in INDICATORS.items():
+        if pattern.search(text):
+            return "indicator", ticker, {"indicator": name, "period": _period(text, default_period)}
+    if CHANGE.search(text):
+        label, bars = next(((label, bars) for pattern, label, bars in CHANGE_PERIODS if pattern.search(text)), ("1 day", 1))
+        return "change", ticker, {"label": label, "bars": bars}
+    if PRICE.search(text):
+        return "price", ticker, {}
+    return None, None, {"reason": "no lookup intent recognized"}
+
+
+@cached("fundamentals", max_entries=500, ttl=24 * 60 * 60)
+def _market_cap(ticker):
+    import yfinance as yf  # deferred: only market-cap lookups need it
+
+    return yf.Ticker(ticker).fast_info["marketCap"]
+
+
+def _format_money(value):
+    for threshold, suffix in ((1e12, "T"), (1e9, "B"), (1e6, "M")):
+        if abs(value) >= threshold:
+            return f"${value / threshold:,.2f}{suffix}"
+    return f"${value:,.2f}"
+
+
+def _indicator_answer(df, ticker, indicator, period):
+    """Computes one indicator like the Home page does and describes its latest value."""
+    close = df["Close"].iloc[-1]
+    if indicator == "rsi":
+        value = calculate_rsi(df, period)["RSI"].iloc[-1]
+        state = "overbought" if value > 70 else "oversold" if value < 30 else "neutral"
+        return f"**RSI ({period})** for {ticker}: {value:.2f} ({state})"
+    if indicator == "macd":
+        df = calculate_macd(df)
+        macd, signal = df["MACD"].iloc[-1], df["MACD_Signal"].iloc[-1]
+        return (f"**MACD (12, 26, 9)** for {ticker}: {macd:.2f}, signal {signal:.2f}, "
+                f"histogram {macd - signal:.2f} ({'bullish' if macd > signal else 'bearish'})")
+    if indicator == "bollinger":
+        df = calculate_bollinger_bands(df, period)
+        return (f"**Bollinger Bands ({period}, 2)** for {ticker}: upper ${df['Upper_Band'].iloc[-1]:.2f}, "
+                f"middle ${df[f'SMA_{period}'].iloc[-1]:.2f}, lower ${df['Lower_Band'].iloc[-1]:.2f} (close ${close:.2f})")
+    if indicator == "stochastic":
+        df = calculate_stochastic(df, period)
+        return f"**Stochastic ({period}, 3)** for {ticker}: %K {df['%K'].iloc[-1]:.2f}, %D {df['%D'].iloc[-1]:.2f}"
+    if indicator == "adx":
+        df = calculate_adx(df, period)
+        return (f"**ADX ({period})** for {ticker}: {df['ADX'].iloc[-1]:.2f}, "
+                f"+DI {df['+DI'].iloc[-1]:.2f}, -DI {df['-DI'].iloc[-1]:.2f}")
+    if indicator == "williams":
+        return f"**Williams %R ({period})** for {ticker}: {calculate_williams_r(df, period)['Williams_%R'].iloc[-1]:.2f}"
+    if indicator == "cci":
+        return f"**CCI ({period})** for {ticker}: {calculate_cci(df, period)['CCI'].iloc[-1]:.2f}"
+    if indicator == "mfi":
+        return f"**MFI ({period})** for {ticker}: {calculate_mfi(df, period)['MFI'].iloc[-1]:.2f}"
+    if indicator == "atr":
+        value = calculate_atr(df, period)["ATR"].iloc[-1]
+        return f"**ATR ({period})** for {ticker}: ${value:.2f} ({value / close * 100:.2f}% of price)"
+    if indicator == "vwap":
+        return f"**VWAP** for {ticker} since {df.index[0].date()}: ${calculate_vwap(df)['VWAP'].iloc[-1]:.2f} (close ${close:.2f})"
+    if indicator == "psar":
+        value = calculate_psar(df)["PSAR"].iloc[-1]
+        return f"**Parabolic SAR** for {ticker}: ${value:.2f} ({'bullish' if close > value else 'bearish'})"
+    if indicator == "ema":
+        value = calculate_moving_average(df, period, "EMA")[f"EMA_{period}"].iloc[-1]
+    else:
+        value = calculate_sma(df, period)[f"SMA_{period}"].iloc[-1]
+    return (f"**{indicator.upper()} ({period})** for {ticker}: ${value:.2f} "
+            f"(close ${close:.2f}, {'above' if close > value else 'below'})")
+
+
+def _answer(intent, ticker, params):
+    if intent == "market_cap":
+        return f"**{ticker}** market capitalization: {_format_money(_market_cap(ticker))}"
+
+    start = datetime.date.today() - datetime.timedelta(days=HISTORY_DAYS)
+    df = load_data(ticker, start, None)
+    if df.empty or "Close" not in df.columns:
+        raise ValueError(f"no price data for {ticker}")
+    df = df.copy()
+    date = df.index[-1].date()
+
+    if intent == "price":
+        close = df["Close"].iloc[-1]
+        change = close / df["Close"].iloc[-2] - 1 if len(df) > 1 else 0.0
+        return f"**{ticker}** latest price: **${close:,.2f}** as of {date} ({change:+.2%} on the day)."
+    if intent == "change":
+        if params["bars"] is None:
+            base = df["Close"][df.index.year < date.year]
+            if base.empty:
+                raise ValueError("not enough history for a year-to-date change")
+            base = base.iloc[-1]
+        else:
+            if len(df) <= params["bars"]:
+                raise ValueError("not enough history for the requested period")
+            base = df["Close"].iloc[-1 - params["bars"]]
+        close = df["Close"].iloc[-1]
+        return (f"**{ticker}** changed **{close / base - 1:+.2%}** over {params['label']} "
+                f"(${base:,.2f} → ${close:,.2f}, as of {date}).")
+    return f"{_indicator_answer(df, ticker, params['indicator'], params['period'])} as of {date}."
+
+
+def answer_locally(prompt):
+    """
+    Answers a simple lookup from local data. Returns the markdown answer, or None when
+    the prompt should go to the agent team. The decision and its latency are logged.
+    """
+    started = time.perf_counter()
+    intent, ticker, params = classify(prompt)
+    answer = None
+    if intent is not None:
+        try:
+            answer = _answer(intent, ticker, params)
+        except Exception as e:
+            params = {**params, "reason": f"lookup failed: {e}"}
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if answer is not None:
+        logger.info("route=local intent=%s ticker=%s params=%s ms=%.1f prompt=%r",
+                    intent, ticker, params, elapsed_ms, prompt)
+    else:
+        logger.info("route=team reason=%r ms=%.1f prompt=%r", params.get("reason"), elapsed_ms, prompt)
+    return answer
@@ -0,0 +1,253 @@
+"""
+Recursive indicator kernels over (time, ticker) float64 arrays.
+
+Exponential smoothing and the Parabolic SAR depend on their own previous value, so they
+can't be written as array expressions; the mean deviation behind the CCI needs each
+window's own mean. With numba installed (pip install numba) they run
+as compiled loops, compiled on first use and cached on disk so later processes start
+without recompiling. Otherwise pandas' ewm and a NumPy loop over time are used. Both
+backends give identical results. INDICATOR_BACKEND=numpy forces the fallback.
+
+Usage: python kernels.py   (compiles the numba kernels into the cache ahead of the first request)
+"""
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+BACKENDS = ("numba", "numpy")
+
+_backend = None
+_compiled = {}
+
+
+def get_backend():
+    """Returns the active backend: INDICATOR_BACKEND if set, else numba when it is installed."""
+    global _backend
+    if _backend is None:
+        requested = os.environ.get("INDICATOR_BACKEND", "auto")
+        if requested == "auto":
+            requested = "numba" if importlib.util.find_spec("numba") else "numpy"
+        set_backend(requested)
+    return _backend
+
+
+def set_backend(name):
+    """Switches between the "numba" and "numpy" kernels."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown indicator backend {name!r}; expected one of {BACKENDS}")
+    if name == "numba" and not importlib.util.find_spec("numba"):
+        raise ImportError("The numba indicator backend requires numba (pip install numba)")
+    _backend = name
+
+
+def _jit(func):
+    """
+    Compiles a kernel with numba on first use; importing numba is deferred until then.
+    Kernels run serially: Streamlit calls them from many session threads at once, which
+    numba's parallel threading layers don't support.
+    """
+    if func.__name__ not in _compiled:
+        import numba
+
+        _compiled[func.__name__] = numba.njit(cache=True, nogil=True)(func)
+    return _compiled[func.__name__]
+
+
+def _as_2d(values):
+    values = np.asarray(values, dtype="float64")
+    return values[:, None] if values.ndim == 1 else values
+
+
+def _by_ticker(values):
+    """(time, ticker) -> C-contiguous (ticker, time): one compiled signature, contiguous inner loops."""
+    return np.ascontiguousarray(_as_2d(values).T)
+
+
+def _ewm_mean_loop(values, alpha):
+    # Rows are tickers. Same arithmetic as pandas' ewm(alpha, adjust=False).mean():
+    # NaNs decay the previous weight and the last value is carried through them
+    out = np.empty_like(values)
+    old_wt_factor = 1.0 - alpha
+    for j in range(values.shape[0]):
+        weighted = values[j, 0]
+        old_wt = 1.0
+        out[j, 0] = weighted
+        for i in range(1, values.shape[1]):
+            cur = values[j, i]
+            if weighted == weighted:
+                old_wt *= old_wt_factor
+                if cur == cur:
+                    if weighted != cur:
+                        weighted = old_wt * weighted + alpha * cur
+                        weighted /= old_wt + alpha
+                    old_wt = 1.0
+            elif cur == cur:
+                weighted = cur
+            out[j, i] = weighted
+    return out
+
+
+def ewm_mean(values, alpha):
+    """Exponentially weighted mean along time, equal to pandas' ewm(alpha=alpha, adjust=False).mean()."""
+    if not _as_2d(values).size:
+        return _as_2d(values).copy()
+    if get_backend() == "numba":
+        return _jit(_ewm_mean_loop)(_by_ticker(values), float(alpha)).T
+    return pd.DataFrame(_as_2d(values), copy=False).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def _psar_loop(high, low, step, max_step):
+    # Rows are tickers
+    out = np.full(high.shape, np.nan)
+    for j in range(high.shape[0]):
+        started = False
+        up = True
+        sar = ep = np.nan
+        af = step
+        h1 = l1 = h2 = l2 = np.nan
+        for t in range(high.shape[1]):
+            ht, lt = high[j, t], low[j, t]
+            if ht != ht or lt != lt:
+                continue
+            if not started:
+                started = True
+                sar, ep = lt, ht
+            else:
+                nxt = sar + af * (ep - sar)
+                # The SAR may not move into the previous two bars' range
+                if up:
+                    if l1 == l1 and l1 < nxt:
+                        nxt = l1
+                    if l2 == l2 and l2 < nxt:
+                        nxt = l2
+                    reverse = lt < nxt
+                    extend = not reverse and ht > ep
+                else:
+                    if h1 == h1 and h1 > nxt:
+                        nxt = h1
+                    if h2 == h2 and h2 > nxt:
+                        nxt = h2
+                    reverse = ht > nxt
+                    extend = not reverse and lt < ep
+                if reverse:
+                    sar = ep
+                    ep = lt if up else ht
+                    af = step
+                    up = not up
+                else:
+                    sar = nxt
+                    if extend:
+                        ep = ht if up else lt
+                        af = min(af + step, max_step)
+                out[j, t] = sar
+            h2, l2 = h1, l1
+            h1, l1 = ht, lt
+    return out
+
+
+def _psar_numpy(high, low, step, max_step):
+    # One pass over time; every step updates all tickers at once
+    width = high.shape[1]
+    out = np.full(high.shape, np.nan)
+    up = np.ones(width, dtype=bool)
+    sar, ep = np.full(width, np.nan), np.full(width, np.nan)
+    af = np.full(width, step)
+    h1, l1, h2, l2 = (np.full(width, np.nan) for _ in range(4))
+
+    with np.errstate(invalid="ignore"):
+        for t in range(len(high)):
+            ht, lt = high[t], low[t]
+            valid = ~(np.isnan(ht) | np.isnan(lt))
+            first = valid & np.isnan(sar)
+            live = valid & ~first
+
+            nxt = sar + af * (ep - sar)
+            nxt = np.where(up, np.fmin(nxt, np.fmin(l1, l2)), np.fmax(nxt, np.fmax(h1, h2)))
+            reverse = np.where(up, lt < nxt, ht > nxt)
+            extend = ~reverse & np.where(up, ht > ep, lt < ep)
+
+            out[t] = np.where(live, np.where(reverse, ep, nxt), np.nan)
+            new_ep = np.where(reverse, np.where(up, lt, ht), np.where(extend, np.where(up, ht, lt), ep))
+            new_af = np.where(reverse, step, np.where(extend, np.minimum(af + step, max_step), af))
+            sar = np.where(live, out[t], np.where(first, lt, sar))
+            ep = np.where(live, new_ep, np.where(first, ht, ep))
+            af = np.where(live, new_af, af)
+            up = np.where(live, up ^ reverse, up)
+            h2, l2 = np.where(valid, h1, h2), np.where(valid, l1, l2)
+            h1, l1 = np.where(valid, ht, h1), np.where(valid, lt, l1)
+    return out
+
+
+def psar(high, low, step=0.02, max_step=0.2):
+    """
+    Wilder's Parabolic SAR per column, starting in an uptrend on each ticker's first
+    bar. Bars where High or Low is missing are skipped.
+    """
+    if not _as_2d(high).size:
+        return np.full(_as_2d(high).shape, np.nan)
+    if get_backend() == "numba":
+        return _jit(_psar_loop)(_by_ticker(high), _by_ticker(low), float(step), float(max_step)).T
+    return _psar_numpy(_as_2d(high), _as_2d(low), step, max_step)
+
+
+def _mean_deviation_loop(values, period):
+    # Rows are tickers. Windows with a missing value give NaN, like a rolling mean does
+    out = np.full(values.shape, np.nan)
+    for j in range(values.shape[0]):
+        for t in range(period - 1, values.shape[1]):
+            total = 0.0
+            for k in range(t - period + 1, t + 1):
+                total += values[j, k]
+            if total != total:
+                continue
+            mean = total / period
+            deviation = 0.0
+            for k in range(t - period + 1, t + 1):
+                deviation += abs(values[j, k] - mean)
+            out[j, t] = deviation / period
+    return out
+
+
+def _mean_deviation_numpy(values, period):
+    # Sliding windows are views; chunks of rows keep the (rows, ticker, period) temporaries bounded
+    out = np.full(values.shape, np.nan)
+    windows = np.lib.stride_tricks.sliding_window_view(values, period, axis=0)
+    chunk = max(1, (1 << 22) // max(values.shape[1] * period, 1))
+    for start in range(0, len(windows), chunk):
+        block = windows[start:start + chunk]
+        mean = block.mean(axis=2, keepdims=True)
+        out[period - 1 + start:period - 1 + start + len(block)] = np.abs(block - mean).mean(axis=2)
+    return out
+
+
+def mean_deviation(values, period):
+    """Rolling mean absolute deviation from each window's own mean, per column; NaN until `period` bars."""
+    values = _as_2d(values)
+    if not values.size or period > len(values):
+        return np.full(values.shape, np.nan)
+    if get_backend() == "numba":
+        return _jit(_mean_deviation_loop)(_by_ticker(values), int(period)).T
+    return _mean_deviation_numpy(values, int(period))
+
+
+def precompile():
+    """Compiles every numba kernel into the on-disk cache (run once per deployment)."""
+    if get_backend() != "numba":
+        return False
+    sample = np.ones((3, 2))
+    ewm_mean(sample, 0.5)
+    psar(sample, sample)
+    mean_deviation(sample, 2)
+    return True
+
+
+if __name__ == "__main__":
+    import time
+
+    started = time.perf_counter()
+    compiled = precompile()
+    print(f"Backend: {get_backend()}"
+          + (f"; kernels compiled and cached in {time.perf_counter() - started:.1f}s" if compiled else ""))
@@ -0,0 +1,321 @@
+"""
+Process-wide scheduler for LLM requests.
+
+Every agent model call takes a slot here before it reaches the provider, so all
+sessions in a process share one concurrency cap and one tokens-per-minute budget:
+
+- LLM_MAX_CONCURRENCY (default 4) requests run at once
+- LLM_TOKENS_PER_MINUTE (default 1,000,000) tokens are spent per minute; each request
+  reserves an estimate up front and the difference is settled from the reported usage
+- interactive requests (chat) are always dispatched before background jobs
+- within a priority, sessions take turns, so one session's burst of agent calls
+  can't starve the others
+- a waiting caller is told its queue position whenever it changes
+
+Callers tag their requests with request_context(); scheduled_model() wraps an agno
+model class (or any client with the same invoke methods) so every call goes through
+the scheduler.
+"""
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Reserved for the response when estimating a request's tokens
+OUTPUT_TOKENS = int(os.environ.get("LLM_OUTPUT_TOKENS", 1024))
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the scheduler already holds max_queued waiting requests."""
+
+
+class Ticket:
+    """One request's place in the queue."""
+
+    def __init__(self, session, priority, tokens, sequence):
+        self.session = session
+        self.priority = priority
+        self.tokens = tokens
+        self.sequence = sequence
+        self.granted = False
+        self.withdrawn = False
+        # Set by the caller once the provider reports usage; the reservation is settled against it
+        self.used_tokens = None
+
+
+class LLMScheduler:
+    """
+    Concurrency cap, token bucket and fair priority queue shared by all model calls.
+    `clock` is injectable so tests can drive the token budget without sleeping.
+    """
+
+    def __init__(self, max_concurrency=4, tokens_per_minute=1_000_000, max_queued=200, clock=time.monotonic):
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.max_queued = max_queued
+        self._clock = clock
+        self._cond = threading.Condition()
+        # priority -> session -> FIFO of tickets; session order is the round-robin order
+        self._queues = {INTERACTIVE: OrderedDict(), BACKGROUND: OrderedDict()}
+        self._running = 0
+        self._tokens = float(tokens_per_minute)
+        self._refilled = clock()
+        self._sequence = itertools.count()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.tokens_per_minute,
+                           self._tokens + (now - self._refilled) * self.tokens_per_minute / 60)
+        self._refilled = now
+
+    def _order(self):
+        """Waiting tickets in the order they will be dispatched."""
+        order = []
+        for priority in (INTERACTIVE, BACKGROUND):
+            sessions = [list(queue) for queue in self._queues[priority].values()]
+            for turn in itertools.zip_longest(*sessions):
+                order.extend(ticket for ticket in turn if ticket is not None)
+        return order
+
+    def _dispatch(self):
+        # Called with the lock held. Grants strictly in _order(): a request that doesn't
+        # fit the token budget yet holds back everything behind it instead of being overtaken
+        self._refill()
+        granted = False
+        while self._running < self.max_concurrency:
+            priority = next((p for p in (INTERACTIVE, BACKGROUND) if self._queues[p]), None)
+            if priority is None:
+                break
+            sessions = self._queues[priority]
+            session, queue = next(iter(sessions.items()))
+            ticket = queue[0]
+            if ticket.tokens > self._tokens:
+                break
+            queue.popleft()
+            # The session goes to the back of its priority's rotation
+            del sessions[session]
+            if queue:
+                sessions[session] = queue
+            self._tokens -= ticket.tokens
+            self._running += 1
+            ticket.granted = granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def submit(self, session=None, priority=BACKGROUND, tokens=OUTPUT_TOKENS):
+        """Queues a request and returns its ticket. Estimates above the per-minute budget are capped to it."""
+        with self._cond:
+            if sum(len(queue) for queues in self._queues.values() for queue in queues.values()) >= self.max_queued:
+                raise QueueFullError("Too many requests are waiting for the language model; try again shortly.")
+            ticket = Ticket(session, priority, min(tokens, self.tokens_per_minute), next(self._sequence))
+            self._queues[priority].setdefault(session, deque()).append(ticket)
+            self._dispatch()
+            return ticket
+
+    def position(self, ticket):
+        """Number of requests that will be dispatched before this one (0 when it is next or running)."""
+        with self._cond:
+            if ticket.granted:
+                return 0
+            return self._order().index(ticket)
+
+    def wait(self, ticket, timeout=None, on_wait=None):
+        """
+        Blocks until the ticket is granted. on_wait(position) is called whenever the
+        queue position changes, and on_wait(None) once the request starts.
+        Raises TimeoutError (and withdraws the ticket) after `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        reported = None
+        while True:
+            with self._cond:
+                # Wake up periodically: the token bucket refills with time, not with events
+                while not ticket.granted and not ticket.withdrawn:
+                    position = self._order().index(ticket)
+                    if position != reported and on_wait is not None:
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self._withdraw(ticket)
+                        raise TimeoutError("Timed out waiting for a language model slot.")
+                    self._cond.wait(0.25 if remaining is None else min(remaining, 0.25))
+                    self._dispatch()
+                if ticket.withdrawn:
+                    raise TimeoutError("The request was withdrawn from the language model queue.")
+                if ticket.granted:
+                    break
+            # The callback may be slow (it updates the page), so it runs outside the lock
+            reported = position
+            on_wait(position)
+        if reported is not None:
+            on_wait(None)
+
+    def _withdraw(self, ticket):
+        sessions = self._queues[ticket.priority]
+        sessions[ticket.session].remove(ticket)
+        if not sessions[ticket.session]:
+            del sessions[ticket.session]
+        ticket.withdrawn = True
+        self._dispatch()
+
+    def cancel(self, ticket):
+        """Withdraws a ticket that is still waiting, or releases it if it was granted meanwhile."""
+        with self._cond:
+            if not ticket.granted:
+                if not ticket.withdrawn:
+                    self._withdraw(ticket)
+                return
+        self.release(ticket)
+
+    def release(self, ticket):
+        """Frees the ticket's slot and settles its token reservation against ticket.used_tokens."""
+        with self._cond:
+            self._running -= 1
+            if ticket.used_tokens is not None:
+                # Usage above the estimate is debt that delays the next requests
+                self._tokens += ticket.tokens - ticket.used_tokens
+            self._dispatch()
+
+    @contextlib.contextmanager
+    def slot(self, tokens=OUTPUT_TOKENS, session=None, priority=None, on_wait=None, timeout=None):
+        """
+        Holds a slot for the duration of the block. Session, priority and on_wait default
+        to the caller's request_context(). Set ticket.used_tokens inside the block.
+        """
+        context = _request_context.get()
+        ticket = self.submit(
+            session if session is not None else context["session"],
+            priority if priority is not None else context["priority"],
+            tokens,
+        )
+        try:
+            self.wait(ticket, timeout, on_wait or context["on_wait"])
+        except BaseException:
+            self.cancel(ticket)
+            raise
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def stats(self):
+        """Running and waiting requests and the tokens currently available."""
+        with self._cond:
+            self._refill()
+            return {
+                "running": self._running,
+                "max_concurrency": self.max_concurrency,
+                "interactive_waiting": sum(len(q) for q in self._queues[INTERACTIVE].values()),
+                "background_waiting": sum(len(q) for q in self._queues[BACKGROUND].values()),
+                "tokens_available": int(self._tokens),
+            }
+
+
+_request_context = contextvars.ContextVar(
+    "llm_request_context", default={"session": None, "priority": BACKGROUND, "on_wait": None}
+)
+
+
+@contextlib.contextmanager
+def request_context(session=None, priority=INTERACTIVE, on_wait=None):
+    """Tags every model call made inside the block with a session, a priority and a queue-position callback."""
+    token = _request_context.set({"session": session, "priority": priority, "on_wait": on_wait})
+    try:
+        yield
+    finally:
+        _request_context.reset(token)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Returns the process-wide scheduler, configured from LLM_MAX_CONCURRENCY and LLM_TOKENS_PER_MINUTE."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(
+                max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", 4)),
+                tokens_per_minute=int(os.environ.get("LLM_TOKENS_PER_MINUTE", 1_000_000)),
+            )
+        return _scheduler
+
+
+def set_scheduler(scheduler):
+    """Replaces the process-wide scheduler (e.g. with different limits in a load test)."""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = scheduler
+
+
+def estimate_tokens(messages):
+    """Rough request size: about four characters per token plus room for the response."""
+    return sum(len(str(getattr(message, "content", message) or "")) for message in messages) // 4 + OUTPUT_TOKENS
+
+
+def _usage(response):
+    # Gemini responses and stream chunks report usage_metadata.total_token_count
+    metadata = getattr(response, "usage_metadata", None)
+    return getattr(metadata, "total_token_count", None)
+
+
+def scheduled_model(model_class):
+    """
+    Returns a subclass of an agno model class whose invoke, invoke_stream, ainvoke and
+    ainvoke_stream calls each hold a scheduler slot. Streams hold theirs until exhausted.
+    """
+
+    class Scheduled(model_class):
+        def invoke(self, messages, *args, **kwargs):
+            with get_scheduler().slot(estimate_tokens(messages)) as ticket:
+                response = super().invoke(messages, *args, **kwargs)
+                ticket.used_tokens = _usage(response)
+                return response
+
+        def invoke_stream(self, messages, *args, **kwargs):
+            with get_scheduler().slot(estimate_tokens(messages)) as ticket:
+                for chunk in super().invoke_stream(messages, *args, **kwargs):
+                    ticket.used_tokens = _usage(chunk) or ticket.used_tokens
+                    yield chunk
+
+        async def ainvoke(self, messages, *args, **kwargs):
+            ticket = await _acquire(estimate_tokens(messages))
+            try:
+                response = await super().ainvoke(messages, *args, **kwargs)
+                ticket.used_tokens = _usage(response)
+                return response
+            finally:
+                get_scheduler().release(ticket)
+
+        async def ainvoke_stream(self, messages, *args, **kwargs):
+            ticket = await _acquire(estimate_tokens(messages))
+            try:
+                async for chunk in super().ainvoke_stream(messages, *args, **kwargs):
+                    ticket.used_tokens = _usage(chunk) or ticket.used_tokens
+                    yield chunk
+            finally:
+                get_scheduler().release(ticket)
+
+    Scheduled.__name__ = Scheduled.__qualname__ = f"Scheduled{model_class.__name__}"
+    return Scheduled
+
+
+async def _acquire(tokens):
+    """Async callers wait for their slot in a worker thread so the event loop keeps running."""
+    scheduler, context = get_scheduler(), _request_context.get()
+    ticket = scheduler.submit(context["session"], context["priority"], tokens)
+    try:
+        await asyncio.to_thread(scheduler.wait, ticket, None, context["on_wait"])
+    except BaseException:
+        # Also reached when the awaiting task is cancelled; the worker thread then gives up too
+        scheduler.cancel(ticket)
+        raise
+    return ticket
@@ -0,0 +1,238 @@
+"""
+Concurrent-session load test for Home.py and the Fintelligence page.
+
+Drives N simulated sessions through Streamlit's app-testing API (ticker switches,
+indicator toggles, date changes, chat prompts) against a synthetic replay data
+provider and a fake LLM team, and reports rerun latency percentiles, throughput
+and peak RSS per concurrency level.
+
+Usage: python loadtest.py [--concurrency 1,2,4,8] [--duration 30] [--chat-share 0.2]
+                          [--llm-latency 2.0] [--llm-concurrency 4] [--llm-tpm 1000000]
+                          [--tickers 50] [--seed 0]
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+HOME_PAGE = os.path.join(APP_DIR, "Home.py")
+CHAT_PAGE = os.path.join(APP_DIR, "pages", "1_Fintelligence.py")
+
+CHAT_PROMPTS = [
+    "What is the current stock price of apple?",
+    "Compare the valuation of MSFT and GOOGL",
+    "Summarize the latest news for NVDA",
+    "What are the main risks of holding TSLA?",
+]
+
+
+class FakeModelClient:
+    """
+    Stands in for an agno model: invoke/invoke_stream sleep for `latency` seconds and
+    report `tokens` of usage the way Gemini does. Wrap it with llm_scheduler.scheduled_model
+    to exercise the scheduler without calling a provider.
+    """
+
+    def __init__(self, latency=2.0, chunks=20, tokens=1500):
+        self.latency = latency
+        self.chunks = chunks
+        self.tokens = tokens
+
+    def _response(self, content, final):
+        usage = SimpleNamespace(total_token_count=self.tokens) if final else None
+        return SimpleNamespace(content=content, usage_metadata=usage)
+
+    def invoke(self, messages, **kwargs):
+        time.sleep(self.latency)
+        return self._response(f"Answer to '{messages[-1]}'.", True)
+
+    def invoke_stream(self, messages, **kwargs):
+        for i in range(self.chunks):
+            time.sleep(self.latency / self.chunks)
+            yield self._response(f"Part {i + 1} of the answer to '{messages[-1]}'. ", i == self.chunks - 1)
+
+
+class FakeTeam:
+    """Stands in for the agno finance team: streams a canned answer from a scheduled fake model."""
+
+    def __init__(self, latency=2.0, chunks=20):
+        from llm_scheduler import scheduled_model
+
+        self.model = scheduled_model(FakeModelClient)(latency, chunks)
+
+    def run(self, message, stream=True, **kwargs):
+        from agno.run.team import TeamRunEvent
+
+        class Chunk:
+            event = TeamRunEvent.run_response_content
+
+            def __init__(self, content):
+                self.content = content
+
+        for response in self.model.invoke_stream([message]):
+            yield Chunk(response.content)
+
+
+def _rss_bytes():
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # ru_maxrss is the peak so far (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _widget(widgets, label):
+    return next(widget for widget in widgets if widget.label == label)
+
+
+def _home_action(at, rng):
+    """Performs one random widget interaction on Home.py and returns its name."""
+    action = rng.choice(["switch_ticker", "switch_ticker", "toggle_indicator", "change_range"])
+    if action == "switch_ticker":
+        # The ticker selectbox shows company names; AppTest needs the underlying symbol
+        from constituents import load_snapshot
+        symbols = load_snapshot(_widget(at.sidebar.selectbox, "Universe").value)["Symbol"].to_list()
+        _widget(at.sidebar.selectbox, "Ticker").set_value(rng.choice(symbols))
+    elif action == "toggle_indicator":
+        checkbox = rng.choice([cb for cb in at.sidebar.checkbox if cb.label.startswith(("Add", "Mark"))])
+        checkbox.set_value(not checkbox.value)
+    else:
+        days = rng.randint(90, 3 * 365)
+        _widget(at.sidebar.date_input, "Start date").set_value(
+            pd.Timestamp.today().date() - pd.Timedelta(days=days)
+        )
+    return action
+
+
+def _chat_action(at, rng):
+    at.chat_input[0].set_value(rng.choice(CHAT_PROMPTS))
+    return "chat"
+
+
+def _session(page, deadline, seed, results, errors):
+    """Runs one simulated user until the deadline, recording every rerun."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_file(page, default_timeout=120)
+    action = "load"
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            at.run()
+        except Exception as e:
+            errors.append(f"{action}: {e}")
+            return
+        results.append((action, time.perf_counter() - started))
+        if at.exception:
+            errors.append(f"{action}: {at.exception[0].value}")
+            return
+        action = _chat_action(at, rng) if page == CHAT_PAGE else _home_action(at, rng)
+
+
+def run_level(concurrency, duration, chat_share, seed):
+    """Runs `concurrency` sessions for `duration` seconds and summarizes the reruns."""
+    results, errors = [], []
+    peak_rss = _rss_bytes()
+    stop = threading.Event()
+
+    def sample_rss():
+        nonlocal peak_rss
+        while not stop.wait(0.1):
+            peak_rss = max(peak_rss, _rss_bytes())
+
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sampler.start()
+    deadline = time.monotonic() + duration
+    rng = random.Random(seed)
+    sessions = [
+        threading.Thread(
+            target=_session,
+            args=(CHAT_PAGE if rng.random() < chat_share else HOME_PAGE, deadline, seed + i, results, errors),
+        )
+        for i in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+
+    latencies = np.array([latency for _, latency in results]) * 1000
+    summary = {
+        "sessions": concurrency,
+        "reruns": len(results),
+        "throughput_rps": len(results) / elapsed,
+        "p50_ms": np.percentile(latencies, 50) if len(latencies) else np.nan,
+        "p95_ms": np.percentile(latencies, 95) if len(latencies) else np.nan,
+        "p99_ms": np.percentile(latencies, 99) if len(latencies) else np.nan,
+        "peak_rss_mb": peak_rss / 1024 ** 2,
+        "errors": len(errors),
+    }
+    return summary, results, errors
+
+
+def setup_fakes(tickers, llm_latency, seed, llm_concurrency=4, llm_tpm=1_000_000):
+    """
+    Points the app at a synthetic universe, a paused replay provider and a fake LLM team
+    whose calls go through a scheduler with the given limits.
+    """
+    import constituents
+    import data_loader
+    import finance_team
+    import llm_scheduler
+    from replay import ReplayProvider
+
+    constituents.STORE_DIR = tempfile.mkdtemp(prefix="loadtest-constituents-")
+    symbols = [f"SYN{i:03d}" for i in range(tickers)]
+    constituents.save_snapshot("S&P 500", pd.DataFrame({
+        "Symbol": symbols,
+        "Security": [f"Synthetic Company {i}" for i in range(tickers)],
+        "Sector": ["Synthetic"] * tickers,
+    }))
+    data_loader.set_data_provider(ReplayProvider(speed=0, seed=seed))
+    llm_scheduler.set_scheduler(llm_scheduler.LLMScheduler(llm_concurrency, llm_tpm))
+    fake_team = FakeTeam(latency=llm_latency)
+    finance_team.get_finance_team = lambda: fake_team
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", default="1,2,4,8")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per concurrency level")
+    parser.add_argument("--chat-share", type=float, default=0.2, help="share of sessions on the chat page")
+    parser.add_argument("--llm-latency", type=float, default=2.0, help="seconds per fake LLM answer")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="LLM scheduler concurrency cap")
+    parser.add_argument("--llm-tpm", type=int, default=1_000_000, help="LLM scheduler tokens per minute")
+    parser.add_argument("--tickers", type=int, default=50, help="size of the synthetic universe")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Sessions run without a browser; silence Streamlit's bare-mode and deprecation warnings
+    import logging
+    logging.disable(logging.WARNING)
+    sys.path.insert(0, APP_DIR)
+    setup_fakes(args.tickers, args.llm_latency, args.seed, args.llm_concurrency, args.llm_tpm)
+
+    rows = []
+    for level in (int(n) for n in args.concurrency.split(",")):
+        summary, results, errors = run_level(level, args.duration, args.chat_share, args.seed)
+        rows.append(summary)
+        for error in errors[:3]:
+            print(f"[{level} sessions] {error}", file=sys.stderr)
+    print(pd.DataFrame(rows).round(1).to_string(index=False))
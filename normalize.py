@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, Holiday, nearest_workday,
+    USMartinLutherKingJr, USPresidentsDay, GoodFriday,
+    USMemorialDay, USLaborDay, USThanksgivingDay
+)
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+OHLCV_COLUMNS = PRICE_COLUMNS + ["Volume"]
+
+# Canonical column -> dtype; columns are emitted in this order
+CANONICAL_DTYPES = {
+    "Open": "float64",
+    "High": "float64",
+    "Low": "float64",
+    "Close": "float64",
+    "Adj Close": "float64",
+    "Volume": "int64",
+    "Dividends": "float64",
+    "Stock Splits": "float64",
+}
+
+# Lower-cased provider field names -> canonical column
+FIELD_ALIASES = {name.lower(): name for name in CANONICAL_DTYPES}
+FIELD_ALIASES.update({
+    "o": "Open", "h": "High", "l": "Low", "c": "Close", "v": "Volume",
+    "adj_close": "Adj Close", "adjclose": "Adj Close", "adjusted close": "Adj Close",
+    "vol": "Volume", "dividend": "Dividends", "splits": "Stock Splits", "stock_splits": "Stock Splits",
+})
+
+EXCHANGE_TZ = "America/New_York"
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """Full-day NYSE closures, used to tell missing bars from market holidays."""
+    rules = [
+        Holiday("New Year's Day", month=1, day=1, observance=nearest_workday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday("Juneteenth", month=6, day=19, start_date="2022-01-01", observance=nearest_workday),
+        Holiday("Independence Day", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas", month=12, day=25, observance=nearest_workday),
+    ]
+
+
+def _field_level(columns):
+    """Returns the MultiIndex level that holds the OHLCV field names."""
+    counts = [
+        sum(str(value).strip().lower() in FIELD_ALIASES for value in columns.levels[level])
+        for level in range(columns.nlevels)
+    ]
+    return int(np.argmax(counts))
+
+
+def normalize_ohlcv(data, tz=EXCHANGE_TZ):
+    """
+    Maps a provider frame to the canonical OHLCV layout in one pass.
+
+    Single-ticker input gives flat canonical columns. Input with a ticker level
+    gives a panel with (field, ticker) columns, so panel["Close"] is a
+    time x ticker frame. Prices are float64, Volume int64 and the index a sorted,
+    de-duplicated, tz-aware DatetimeIndex. Unknown columns are dropped.
+    """
+    columns = data.columns
+    if isinstance(columns, pd.MultiIndex):
+        field_level = _field_level(columns)
+        ticker_level = 1 - field_level if columns.nlevels == 2 else None
+        fields = columns.get_level_values(field_level)
+        tickers = columns.get_level_values(ticker_level) if ticker_level is not None else None
+        if tickers is not None and tickers.nunique() == 1:
+            tickers = None
+    else:
+        fields, tickers = columns, None
+
+    canonical = [FIELD_ALIASES.get(str(field).strip().lower()) for field in fields]
+    keep = [position for position, name in enumerate(canonical) if name is not None]
+    out = data.iloc[:, keep].copy()
+    if tickers is None:
+        out.columns = [canonical[position] for position in keep]
+        out = out.loc[:, ~out.columns.duplicated()]
+        order = [name for name in CANONICAL_DTYPES if name in out.columns]
+    else:
+        out.columns = pd.MultiIndex.from_arrays(
+            [[canonical[position] for position in keep], [tickers[position] for position in keep]],
+            names=["Price", "Ticker"],
+        )
+        out = out.loc[:, ~out.columns.duplicated()]
+        present = out.columns.get_level_values(0)
+        order = [(name, ticker) for name in CANONICAL_DTYPES if name in present
+                 for ticker in out[name].columns]
+    out = out[order]
+
+    index = pd.DatetimeIndex(pd.to_datetime(out.index))
+    index = index.tz_localize(tz) if index.tz is None else index.tz_convert(tz)
+    out.index = index.rename("Date")
+    duplicated = out.index.duplicated(keep="last")
+    out = out[~duplicated].sort_index()
+
+    field_names = out.columns.get_level_values(0) if tickers is not None else out.columns
+    dtypes = {col: CANONICAL_DTYPES[field] for col, field in zip(out.columns, field_names)}
+    volume_cols = [col for col, dtype in dtypes.items() if dtype == "int64"]
+    out[volume_cols] = out[volume_cols].fillna(0)
+    # One cast per dtype, and only for columns that need it: astype(dict) goes column by column
+    current = out.dtypes
+    for dtype in set(dtypes.values()):
+        cast = [col for col, col_dtype in current.items() if dtypes[col] == dtype and col_dtype != dtype]
+        if cast:
+            out[cast] = out[cast].astype(dtype)
+    out.attrs["dropped_duplicates"] = int(duplicated.sum())
+    return out
+
+
+def to_panel(df, ticker):
+    """Wraps a flat single-ticker frame as a (field, ticker) panel; panels pass through."""
+    if isinstance(df.columns, pd.MultiIndex):
+        return df
+    panel = pd.concat({ticker: df}, axis=1, names=["Ticker", "Price"]).swaplevel(axis=1)
+    panel.attrs = df.attrs
+    return panel
+
+
+def adjust_prices(df, split_adjusted=True):
+    """
+    Adjusts Open/High/Low/Close for dividends (and splits) and drops the action columns.
+
+    With an Adj Close column the OHLC prices are scaled by Adj Close / Close.
+    Providers whose prices are not split-adjusted (split_adjusted=False) are
+    back-adjusted from the Stock Splits column, with Volume scaled inversely.
+    Works on flat frames and (field, ticker) panels.
+    """
+    df = df.copy()
+    if not split_adjusted and "Stock Splits" in df.columns:
+        splits = df["Stock Splits"].where(df["Stock Splits"] > 0, 1.0)
+        # Every bar before a split is divided by the product of the later split ratios
+        factor = splits[::-1].cumprod()[::-1].shift(-1).fillna(1.0)
+        for col in PRICE_COLUMNS + ["Adj Close"]:
+            if col in df.columns:
+                df[col] = df[col] / factor
+        if "Volume" in df.columns:
+            df["Volume"] = (df["Volume"] * factor).round().astype("int64")
+    if "Adj Close" in df.columns:
+        ratio = (df["Adj Close"] / df["Close"]).fillna(1.0)
+        for col in PRICE_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col] * ratio
+    level = 0 if isinstance(df.columns, pd.MultiIndex) else None
+    return df.drop(columns=["Adj Close", "Dividends", "Stock Splits"], level=level, errors="ignore")
+
+
+def _as_panel(df, field):
+    values = df[field]
+    return values.to_frame() if isinstance(values, pd.Series) else values
+
+
+def check_quality(df):
+    """
+    Reports data-quality issues in a normalized OHLCV frame or panel.
+
+    Returns a dict with counts of duplicate timestamps (including those
+    dropped by normalize_ohlcv), missing trading days
+    (business days that are not NYSE holidays), zero-volume bars, NaN prices and
+    bars whose High/Low do not bracket Open/Close, plus the first missing dates.
+    """
+    report = {"bars": len(df)}
+    if len(df) == 0:
+        return report
+    report["duplicates"] = df.attrs.get("dropped_duplicates", 0) + int(df.index.duplicated().sum())
+
+    dates = np.unique(df.index.tz_localize(None).normalize().values.astype("datetime64[D]"))
+    holidays = NYSEHolidayCalendar().holidays(dates[0], dates[-1]).values.astype("datetime64[D]")
+    expected = np.arange(dates[0], dates[-1] + np.timedelta64(1, "D"))
+    expected = expected[np.is_busday(expected, holidays=holidays)]
+    missing = np.setdiff1d(expected, dates, assume_unique=True)
+    report["missing_days"] = int(len(missing))
+    report["missing_dates"] = [str(day) for day in missing[:10]]
+
+    present = set(df.columns.get_level_values(0))
+    if "Volume" in present:
+        report["zero_volume"] = int((_as_panel(df, "Volume").to_numpy() == 0).sum())
+    prices = [col for col in PRICE_COLUMNS if col in present]
+    if prices:
+        report["nan_prices"] = int(sum(np.isnan(_as_panel(df, col).to_numpy()).sum() for col in prices))
+    if len(prices) == 4:
+        open_, high, low, close = (_as_panel(df, col).to_numpy() for col in PRICE_COLUMNS)
+        with np.errstate(invalid="ignore"):
+            bad = (high < np.maximum(open_, close)) | (low > np.minimum(open_, close)) | (low > high)
+        report["inconsistent_bars"] = int(bad.sum())
+    return report
@@ -1,8 +1,9 @@
 # app.py
 import streamlit as st
-from finance_team import finance_team
-import asyncio
-from agno.run.team import TeamRunEvent
+from finance_team import get_finance_team
+from intent_router import answer_locally
+from llm_scheduler import INTERACTIVE, request_context
+import uuid
 # --- Streamlit Page Configuration ---
 st.set_page_config(
     page_title="Fintelligence",
@@ -28,6 +29,9 @@ def main():
     # Initialize chat history in session state if it doesn't exist
     if "messages" not in st.session_state:
         st.session_state.messages = []
+    # One id per browser session: it keys the session's team runs and its place in the model-slot queue
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = str(uuid.uuid4())
 
     # Display chat messages from history on app rerun
     for message in st.session_state.messages:
@@ -47,20 +51,46 @@ def main():
             message_placeholder = st.empty()
             full_response = ""
             try:
-                with st.spinner("Thinking..."): # Add spinner here
-                    # Use asyncio.run to execute the async generator
-                    response_stream = finance_team.run(message=prompt, stream=True)
-                    
-                    # Stream the response from the finance team
-                    for chunk in response_stream:
-                        # Only process chunks that are of type 'run_response_content'
-                        # This ensures only the actual AI-generated text is displayed.
-                        if hasattr(chunk, "event") and chunk.event == TeamRunEvent.run_response_content:
-                            if hasattr(chunk, "content") and chunk.content:
-                                full_response += chunk.content
-                                message_placeholder.markdown(full_response + "▌")
+                # Simple lookups are answered from local market data without the agent team
+                local_answer = answer_locally(prompt)
+                if local_answer is not None:
+                    full_response = local_answer
+                    message_placeholder.markdown(full_response)
+                    st.caption("Answered instantly from market data")
+                else:
+                    queue_status = st.empty()
+
+                    def show_queue_position(position):
+                        # Called by the LLM scheduler while this session's model calls wait for a slot
+                        if position is None:
+                            queue_status.empty()
+                        elif position:
+                            queue_status.caption(f"Waiting for a model slot: {position} request(s) ahead of yours")
+                        else:
+                            queue_status.caption("Waiting for a model slot: yours is next")
+
+                    with st.spinner("Thinking..."), request_context(
+                        st.session_state.session_id, INTERACTIVE, show_queue_position
+                    ):
+                        # agno is imported lazily; each session builds its own team on its first question
+                        from agno.run.team import TeamRunEvent
+                        finance_team = get_finance_team()
+                        response_stream = finance_team.run(
+                            message=prompt,
+                            stream=True,
+                            session_id=st.session_state.session_id
+                        )
                     
-                message_placeholder.markdown(full_response)
+                        # Stream the response from the finance team
+                        for chunk in response_stream:
+                            # Only process chunks that are of type 'run_response_content'
+                            # This ensures only the actual AI-generated text is displayed.
+                            if hasattr(chunk, "event") and chunk.event == TeamRunEvent.run_response_content:
+                                if hasattr(chunk, "content") and chunk.content:
+                                    full_response += chunk.content
+                                    message_placeholder.markdown(full_response + "▌")
+
+                    message_placeholder.markdown(full_response)
 
             except Exception as e:
                 st.error(f"An error occurred: {e}")
@@ -0,0 +1,70 @@
+import datetime
+import streamlit as st
+from constituents import list_universes, load_snapshot
+from data_loader import load_data
+from normalize import to_panel
+from patterns import PATTERNS, TREND_BARS, scan_patterns
+
+# --- Streamlit Page Configuration ---
+st.set_page_config(
+    page_title="Pattern Screener",
+    page_icon="🕯️",
+    layout="wide",
+)
+
+# --- Page Title and Description ---
+st.title("Candlestick Pattern Screener")
+st.markdown("""
+Scan a whole universe for candlestick patterns formed in the most recent bars.
+All tickers are loaded in one batch and every pattern is detected in a single vectorized pass.
+""")
+
+# --- Screener Parameters ---
+st.sidebar.header("Screener Parameters")
+universe = st.sidebar.selectbox("Universe", list_universes())
+selected_patterns = st.sidebar.multiselect(
+    "Patterns",
+    list(PATTERNS),
+    default=list(PATTERNS)
+)
+directions = st.sidebar.multiselect(
+    "Direction",
+    ["bullish", "bearish", "neutral"],
+    default=["bullish", "bearish"]
+)
+last_bars = st.sidebar.number_input(
+    label="Bars to look back",
+    min_value=1,
+    max_value=60,
+    value=5,
+    step=1
+)
+
+if not selected_patterns:
+    st.info("Select at least one pattern in the sidebar.")
+    st.stop()
+
+constituents = load_snapshot(universe)
+tickers = constituents["Symbol"].to_list()
+tickers_companies_dict = dict(zip(constituents["Symbol"], constituents["Security"]))
+
+# Enough calendar days for the lookback plus the trend context of the patterns.
+# The end date is exclusive, so ask for tomorrow to include today's bar
+today = datetime.date.today()
+end_date = today + datetime.timedelta(days=1)
+start_date = today - datetime.timedelta(days=(last_bars + TREND_BARS + 2) * 7 // 5 + 10)
+with st.spinner(f"Loading {len(tickers)} tickers..."):
+    panel = to_panel(load_data(tickers, start_date, end_date), tickers[0])
+
+hits = scan_patterns(panel, selected_patterns, last_bars)
+hits = hits[hits["Direction"].isin(directions)]
+hits.insert(2, "Company", hits["Ticker"].map(tickers_companies_dict))
+hits["Date"] = hits["Date"].dt.date
+
+col1, col2 = st.columns([3, 1])
+with col1:
+    st.subheader(f"{len(hits)} pattern(s) in the last {last_bars} bar(s)")
+    st.dataframe(hits, hide_index=True, use_container_width=True)
+with col2:
+    st.subheader("By pattern")
+    st.dataframe(hits["Pattern"].value_counts().rename("Count"), use_container_width=True)
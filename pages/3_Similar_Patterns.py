@@ -0,0 +1,109 @@
+import datetime
+import time
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+from constituents import list_universes, load_snapshot
+from data_loader import load_data
+from normalize import to_panel
+from similarity import get_similarity_index
+
+# --- Streamlit Page Configuration ---
+st.set_page_config(
+    page_title="Similar Patterns",
+    page_icon="🔍",
+    layout="wide",
+)
+
+# --- Page Title and Description ---
+st.title("Similar Pattern Search")
+st.markdown("""
+Find the stocks and dates whose price action looked most like a ticker's recent bars, and what happened next.
+Windows are compared by shape: each one is z-normalized, so price level and volatility don't matter.
+""")
+
+# --- Search Parameters ---
+st.sidebar.header("Search Parameters")
+universe = st.sidebar.selectbox("Universe", list_universes())
+constituents = load_snapshot(universe)
+tickers = constituents["Symbol"].to_list()
+tickers_companies_dict = dict(zip(constituents["Symbol"], constituents["Security"]))
+
+ticker = st.sidebar.selectbox("Ticker", tickers, format_func=tickers_companies_dict.get)
+window = st.sidebar.slider("Pattern length (bars)", min_value=20, max_value=250, value=60, step=5)
+horizon = st.sidebar.slider("Bars after the pattern", min_value=5, max_value=120, value=20, step=5)
+top_k = st.sidebar.number_input("Matches", min_value=1, max_value=50, value=10, step=1)
+years = st.sidebar.slider("Years of history to search", min_value=1, max_value=10, value=5)
+
+# The end date is exclusive, so ask for tomorrow to include today's bar
+today = datetime.date.today()
+end_date = today + datetime.timedelta(days=1)
+start_date = today - datetime.timedelta(days=365 * years)
+with st.spinner(f"Loading {len(tickers)} tickers..."):
+    panel = to_panel(load_data(tickers, start_date, end_date), tickers[0])
+
+started = time.perf_counter()
+index = get_similarity_index(universe, panel, window)
+try:
+    matches = index.query_ticker(ticker, top_k, horizon)
+except ValueError as e:
+    st.warning(f"Can't search with {ticker}'s recent bars: {e}")
+    st.stop()
+elapsed_ms = (time.perf_counter() - started) * 1000
+
+if matches.empty:
+    st.info("Not enough history to search; try a shorter pattern or more years.")
+    st.stop()
+
+matches.insert(1, "Company", matches["Ticker"].map(tickers_companies_dict))
+
+col1, col2 = st.columns([3, 1])
+with col1:
+    st.subheader(f"{tickers_companies_dict[ticker]}'s last {window} bars vs the {len(matches)} closest matches")
+    fig = go.Figure()
+    bars_after = np.arange(-window + 1, horizon + 1)
+    for match in matches.itertuples():
+        path = index.path(match.Ticker, match.End, after=horizon)
+        fig.add_trace(go.Scatter(
+            x=bars_after[:len(path)],
+            y=path,
+            mode="lines",
+            name=f"{match.Ticker} {match.End:%Y-%m-%d}",
+            line=dict(width=1),
+            opacity=0.5,
+        ))
+    fig.add_trace(go.Scatter(
+        x=bars_after[:window],
+        y=index.path(ticker, index.last_date(ticker)),
+        mode="lines",
+        name=ticker,
+        line=dict(color="black", width=3),
+    ))
+    fig.add_vline(x=0, line_dash="dash", line_color="gray")
+    fig.update_layout(
+        height=600,
+        xaxis_title="Bars relative to the end of the pattern",
+        yaxis_title="Z-normalized close",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0),
+    )
+    st.plotly_chart(fig, use_container_width=True)
+with col2:
+    st.subheader(f"Next {horizon} bars")
+    st.metric("Average return", f"{matches['Return'].mean():.2%}")
+    st.metric("Median return", f"{matches['Return'].median():.2%}")
+    st.metric("Matches that rose", f"{(matches['Return'] > 0).mean():.0%}")
+    st.metric("Average max drawdown", f"{matches['Max drawdown'].mean():.2%}")
+    st.caption(f"Searched {len(index.tickers)} tickers x {len(index.dates)} bars in {elapsed_ms:.0f} ms")
+
+matches["Start"] = matches["Start"].dt.date
+matches["End"] = matches["End"].dt.date
+st.dataframe(
+    matches.drop(columns="Distance"),
+    hide_index=True,
+    use_container_width=True,
+    column_config={
+        "Correlation": st.column_config.NumberColumn(format="%.3f"),
+        "Return": st.column_config.NumberColumn(format="percent"),
+        "Max drawdown": st.column_config.NumberColumn(format="percent"),
+    },
+)
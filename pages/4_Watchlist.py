@@ -0,0 +1,110 @@
+import datetime
+import time
+import streamlit as st
+from constituents import list_universes, load_snapshot
+from data_loader import load_data
+from normalize import to_panel
+from watchlist import SIGNAL_COLUMNS, sparkline_figures, summary_signals
+
+# Calendar days loaded: the longest sparkline range plus warm-up for the indicators
+LOOKBACK_DAYS = 400
+
+SPARKLINE_RANGES = {"1 month": 21, "3 months": 63, "6 months": 126, "1 year": 252}
+
+# Tickers shown by default; larger universes can be narrowed in the sidebar
+DEFAULT_TICKERS = 50
+
+SIGNAL_COLORS = {"BULLISH": "green", "OVERSOLD": "green", "BEARISH": "red", "OVERBOUGHT": "red"}
+
+# --- Streamlit Page Configuration ---
+st.set_page_config(
+    page_title="Watchlist",
+    page_icon="📋",
+    layout="wide",
+)
+
+# --- Page Title and Description ---
+st.title("Watchlist")
+st.markdown("""
+Sparklines and the latest Technical Analysis Summary signals for a whole watchlist.
+All tickers are loaded in one batch and every indicator is computed in a single vectorized pass.
+""")
+
+# --- Watchlist Parameters ---
+st.sidebar.header("Watchlist Parameters")
+universe = st.sidebar.selectbox("Watchlist", list_universes())
+constituents = load_snapshot(universe)
+universe_tickers = constituents["Symbol"].to_list()
+tickers_companies_dict = dict(zip(constituents["Symbol"], constituents["Security"]))
+
+tickers = st.sidebar.multiselect(
+    "Tickers",
+    universe_tickers,
+    default=universe_tickers[:DEFAULT_TICKERS],
+    format_func=tickers_companies_dict.get
+)
+sparkline_range = st.sidebar.selectbox("Sparkline range", list(SPARKLINE_RANGES), index=2)
+columns = st.sidebar.slider("Cards per row", min_value=2, max_value=6, value=4)
+sort_by = st.sidebar.selectbox("Sort by", ["Watchlist order", "Change", "RSI", "Ticker"])
+signal_filter = st.sidebar.multiselect(
+    "Only tickers with",
+    ["BULLISH", "BEARISH", "OVERBOUGHT", "OVERSOLD"],
+    help="Keeps tickers showing any of these signals"
+)
+
+if not tickers:
+    st.info("Select at least one ticker in the sidebar.")
+    st.stop()
+
+started = time.perf_counter()
+# The end date is exclusive, so ask for tomorrow to include today's bar
+today = datetime.date.today()
+end_date = today + datetime.timedelta(days=1)
+start_date = today - datetime.timedelta(days=LOOKBACK_DAYS)
+with st.spinner(f"Loading {len(tickers)} tickers..."):
+    panel = to_panel(load_data(tickers, start_date, end_date), tickers[0])
+
+signals = summary_signals(panel)
+sparklines = sparkline_figures(panel["Close"].iloc[-SPARKLINE_RANGES[sparkline_range]:])
+elapsed_ms = (time.perf_counter() - started) * 1000
+
+if signal_filter:
+    signals = signals[signals[SIGNAL_COLUMNS].isin(signal_filter).any(axis=1)]
+if sort_by == "Change":
+    signals = signals.sort_values("Change", ascending=False)
+elif sort_by == "RSI":
+    signals = signals.sort_values("RSI value", ascending=False)
+elif sort_by == "Ticker":
+    signals = signals.sort_index()
+
+st.caption(f"{len(signals)} of {len(tickers)} tickers · loaded and computed in {elapsed_ms:.0f} ms")
+
+
+def signal_text(row):
+    """One line with each indicator's signal, colored like a trading terminal."""
+    parts = []
+    for name in SIGNAL_COLUMNS:
+        signal = row[name]
+        if signal:
+            label = f"RSI {row['RSI value']:.0f}" if name == "RSI" else name
+            color = SIGNAL_COLORS.get(signal)
+            parts.append(f"{label} :{color}[{signal}]" if color else f"{label} {signal}")
+    return " · ".join(parts)
+
+
+rows = list(signals.iterrows())
+for start in range(0, len(rows), columns):
+    for column, (ticker, row) in zip(st.columns(columns), rows[start:start + columns]):
+        with column.container(border=True):
+            change = row["Change"]
+            arrow = f":green[▲ {change:.2%}]" if change >= 0 else f":red[▼ {abs(change):.2%}]"
+            st.markdown(f"**{ticker}** · \\${row['Close']:.2f} {arrow}")
+            st.caption(tickers_companies_dict.get(ticker, ticker))
+            if ticker in sparklines:
+                st.plotly_chart(
+                    sparklines[ticker],
+                    key=f"sparkline_{ticker}",
+                    config={"displayModeBar": False},
+                    use_container_width=True,
+                )
+            st.markdown(signal_text(row))
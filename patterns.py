@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+
+# Bars over which the prior trend is measured for hammer-type patterns
+TREND_BARS = 5
+
+
+def _shift(a, k):
+    """Shifts an array k bars forward along time (axis 0), filling with NaN."""
+    out = np.full_like(a, np.nan)
+    out[k:] = a[:-k]
+    return out
+
+
+def _candles(open_, high, low, close):
+    """Precomputes the candle geometry shared by every pattern."""
+    o, h, l, c = (np.asarray(x, dtype="float64") for x in (open_, high, low, close))
+    top = np.maximum(o, c)
+    bottom = np.minimum(o, c)
+    body = top - bottom
+    candles = {
+        "o": o, "h": h, "l": l, "c": c,
+        "body": body,
+        "range": h - l,
+        "upper": h - top,
+        "lower": bottom - l,
+        "top": top,
+        "bottom": bottom,
+        "bull": c > o,
+        "bear": c < o,
+    }
+    prior = _shift(c, 1)
+    candles["uptrend"] = prior > _shift(c, TREND_BARS + 1)
+    candles["downtrend"] = prior < _shift(c, TREND_BARS + 1)
+    return candles
+
+
+def _prev(candles, name, k):
+    """Returns a candle attribute k bars back (k=0 is the current bar)."""
+    value = candles[name]
+    if k == 0:
+        return value
+    return _shift(value.astype("float64"), k) == 1 if value.dtype == bool else _shift(value, k)
+
+
+def doji(x):
+    """Open and close are nearly equal."""
+    return (x["range"] > 0) & (x["body"] <= 0.1 * x["range"])
+
+
+def _hammer_shape(x):
+    return (x["body"] > 0) & (x["lower"] >= 2 * x["body"]) & (x["upper"] <= 0.1 * x["range"])
+
+
+def _inverted_shape(x):
+    return (x["body"] > 0) & (x["upper"] >= 2 * x["body"]) & (x["lower"] <= 0.1 * x["range"])
+
+
+def hammer(x):
+    """Long lower shadow and small body at the top of the range, after a decline."""
+    return _hammer_shape(x) & x["downtrend"]
+
+
+def hanging_man(x):
+    """Hammer shape after a rise."""
+    return _hammer_shape(x) & x["uptrend"]
+
+
+def inverted_hammer(x):
+    """Long upper shadow and small body at the bottom of the range, after a decline."""
+    return _inverted_shape(x) & x["downtrend"]
+
+
+def shooting_star(x):
+    """Inverted hammer shape after a rise."""
+    return _inverted_shape(x) & x["uptrend"]
+
+
+def bullish_engulfing(x):
+    """A bullish body that engulfs the previous bearish body."""
+    o1, c1 = _prev(x, "o", 1), _prev(x, "c", 1)
+    return _prev(x, "bear", 1) & x["bull"] & (x["o"] <= c1) & (x["c"] >= o1) & (x["body"] > _prev(x, "body", 1))
+
+
+def bearish_engulfing(x):
+    """A bearish body that engulfs the previous bullish body."""
+    o1, c1 = _prev(x, "o", 1), _prev(x, "c", 1)
+    return _prev(x, "bull", 1) & x["bear"] & (x["o"] >= c1) & (x["c"] <= o1) & (x["body"] > _prev(x, "body", 1))
+
+
+def _star_setup(x):
+    """Long first candle followed by a small-bodied star."""
+    body2, range2 = _prev(x, "body", 2), _prev(x, "range", 2)
+    return (body2 >= 0.5 * range2) & (_prev(x, "body", 1) <= 0.3 * body2)
+
+
+def morning_star(x):
+    """Long bearish candle, a star gapping below it, then a bullish close past its midpoint."""
+    o2, c2 = _prev(x, "o", 2), _prev(x, "c", 2)
+    return (
+        _star_setup(x) & _prev(x, "bear", 2) & x["bull"]
+        & (_prev(x, "top", 1) < c2)
+        & (x["c"] > (o2 + c2) / 2)
+    )
+
+
+def evening_star(x):
+    """Long bullish candle, a star gapping above it, then a bearish close past its midpoint."""
+    o2, c2 = _prev(x, "o", 2), _prev(x, "c", 2)
+    return (
+        _star_setup(x) & _prev(x, "bull", 2) & x["bear"]
+        & (_prev(x, "bottom", 1) > c2)
+        & (x["c"] < (o2 + c2) / 2)
+    )
+
+
+def three_white_soldiers(x):
+    """Three bullish candles, each opening inside the previous body and closing higher."""
+    result = x["bull"] & (x["upper"] <= 0.3 * x["body"])
+    for k in (1, 2):
+        result = result & _prev(x, "bull", k) & (_prev(x, "upper", k) <= 0.3 * _prev(x, "body", k))
+    for k in (0, 1):
+        o, c = _prev(x, "o", k), _prev(x, "c", k)
+        o1, c1 = _prev(x, "o", k + 1), _prev(x, "c", k + 1)
+        result = result & (o > o1) & (o < c1) & (c > c1)
+    return result
+
+
+def three_black_crows(x):
+    """Three bearish candles, each opening inside the previous body and closing lower."""
+    result = x["bear"] & (x["lower"] <= 0.3 * x["body"])
+    for k in (1, 2):
+        result = result & _prev(x, "bear", k) & (_prev(x, "lower", k) <= 0.3 * _prev(x, "body", k))
+    for k in (0, 1):
+        o, c = _prev(x, "o", k), _prev(x, "c", k)
+        o1, c1 = _prev(x, "o", k + 1), _prev(x, "c", k + 1)
+        result = result & (o < o1) & (o > c1) & (c < c1)
+    return result
+
+
+# Pattern name -> (direction, kernel)
+PATTERNS = {
+    "Doji": ("neutral", doji),
+    "Hammer": ("bullish", hammer),
+    "Inverted Hammer": ("bullish", inverted_hammer),
+    "Hanging Man": ("bearish", hanging_man),
+    "Shooting Star": ("bearish", shooting_star),
+    "Bullish Engulfing": ("bullish", bullish_engulfing),
+    "Bearish Engulfing": ("bearish", bearish_engulfing),
+    "Morning Star": ("bullish", morning_star),
+    "Evening Star": ("bearish", evening_star),
+    "Three White Soldiers": ("bullish", three_white_soldiers),
+    "Three Black Crows": ("bearish", three_black_crows),
+}
+
+
+def detect_patterns(open_, high, low, close, patterns=None):
+    """
+    Runs the pattern kernels over OHLC arrays of shape (time,) or (time, ticker).
+    Returns {pattern name: boolean array of the same shape}.
+    """
+    candles = _candles(open_, high, low, close)
+    with np.errstate(invalid="ignore"):
+        return {name: PATTERNS[name][1](candles) for name in (patterns or PATTERNS)}
+
+
+def find_patterns(df, patterns=None):
+    """Returns a boolean DataFrame (one column per pattern) for a single-ticker OHLC frame."""
+    found = detect_patterns(df["Open"], df["High"], df["Low"], df["Close"], patterns)
+    return pd.DataFrame(found, index=df.index)
+
+
+def scan_patterns(panel, patterns=None, last_bars=1):
+    """
+    Screens a (field, ticker) panel for patterns in its last `last_bars` bars.
+    Returns one row per hit with Date, Ticker, Pattern, Direction and Close.
+    """
+    panel = panel.iloc[:, panel.columns.get_level_values(0).isin(["Open", "High", "Low", "Close"])]
+    fields = {field: panel[field] for field in ["Open", "High", "Low", "Close"]}
+    tickers = fields["Close"].columns
+    found = detect_patterns(fields["Open"], fields["High"], fields["Low"], fields["Close"], patterns)
+
+    rows = []
+    close = fields["Close"].to_numpy()[-last_bars:]
+    dates = panel.index[-last_bars:]
+    for name, hits in found.items():
+        bar, col = np.nonzero(hits[-last_bars:])
+        rows.append(pd.DataFrame({
+            "Date": dates[bar],
+            "Ticker": tickers[col],
+            "Pattern": name,
+            "Direction": PATTERNS[name][0],
+            "Close": close[bar, col],
+        }))
+    result = pd.concat(rows, ignore_index=True) if rows else pd.DataFrame(
+        columns=["Date", "Ticker", "Pattern", "Direction", "Close"]
+    )
+    return result.sort_values(["Date", "Ticker"], ascending=[False, True], ignore_index=True)
@@ -5,8 +5,11 @@ import pandas as pd
 from indicators import (
     calculate_macd, calculate_atr, calculate_obv,
     calculate_stochastic, calculate_rsi, calculate_sma,
-    calculate_bollinger_bands
+    calculate_bollinger_bands, calculate_moving_average, calculate_vwap,
+    calculate_adx, calculate_ichimoku, calculate_keltner_channels,
+    calculate_psar, calculate_williams_r, calculate_cci, calculate_mfi
 )
+from patterns import PATTERNS, find_patterns
 
 def plot_stock_chart(df, ticker, tickers_companies_dict, indicator_params):
     """
@@ -65,6 +68,26 @@ def plot_stock_chart(df, ticker, tickers_companies_dict, indicator_params):
                 name='Price'
             ))
 
+            # Add candlestick pattern markers if requested
+            if indicator_params["patterns_flag"] and indicator_params["patterns"]:
+                found = find_patterns(df, indicator_params["patterns"])
+                for pattern, hits in found.items():
+                    if not hits.any():
+                        continue
+                    direction = PATTERNS[pattern][0]
+                    # Bullish markers sit below the candle, bearish and neutral ones above it
+                    fig.add_trace(go.Scatter(
+                        x=df.index[hits],
+                        y=df['Low'][hits] * 0.99 if direction == "bullish" else df['High'][hits] * 1.01,
+                        mode='markers',
+                        name=pattern,
+                        marker=dict(
+                            symbol={"bullish": "triangle-up", "bearish": "triangle-down"}.get(direction, "diamond"),
+                            color={"bullish": "green", "bearish": "red"}.get(direction, "gray"),
+                            size=9
+                        )
+                    ))
+
         # Add Volume if requested and available
         if indicator_params["volume_flag"] and 'Volume' in df.columns:
             fig.add_trace(go.Bar(
@@ -261,6 +284,193 @@ def plot_stock_chart(df, ticker, tickers_companies_dict, indicator_params):
                 )
             )
 
+        # Add EMA/WMA/HMA/Wilder moving average if requested
+        if indicator_params["ma_flag"] and 'Close' in df.columns:
+            ma_column = f'{indicator_params["ma_type"]}_{indicator_params["ma_periods"]}'
+            df = calculate_moving_average(df, indicator_params["ma_periods"], indicator_params["ma_type"])
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df[ma_column],
+                name=f'{indicator_params["ma_type"]} ({indicator_params["ma_periods"]})',
+                line=dict(color='teal')
+            ))
+
+        # Add VWAP if requested
+        if indicator_params["vwap_flag"] and all(col in df.columns for col in ['High', 'Low', 'Close', 'Volume']):
+            df = calculate_vwap(df, indicator_params["vwap_period"] or None)
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['VWAP'],
+                name=f'VWAP ({indicator_params["vwap_period"] or "anchored"})',
+                line=dict(color='goldenrod', dash='dot')
+            ))
+
+        # Add Ichimoku Cloud if requested
+        if indicator_params["ichimoku_flag"] and all(col in df.columns for col in ['High', 'Low', 'Close']):
+            df = calculate_ichimoku(df, indicator_params["ichimoku_conversion"], indicator_params["ichimoku_base"], indicator_params["ichimoku_span_b"])
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['Tenkan_Sen'],
+                name='Tenkan-sen',
+                line=dict(color='rgba(0, 100, 250, 0.8)')
+            ))
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['Kijun_Sen'],
+                name='Kijun-sen',
+                line=dict(color='rgba(150, 0, 50, 0.8)')
+            ))
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['Senkou_Span_A'],
+                name='Senkou Span A',
+                line=dict(color='rgba(0, 150, 0, 0.5)')
+            ))
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['Senkou_Span_B'],
+                name='Senkou Span B',
+                fill='tonexty',
+                fillcolor='rgba(120, 120, 120, 0.15)',
+                line=dict(color='rgba(250, 0, 0, 0.5)')
+            ))
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['Chikou_Span'],
+                name='Chikou Span',
+                line=dict(color='rgba(100, 100, 100, 0.6)', dash='dot')
+            ))
+
+        # Add Keltner Channels if requested
+        if indicator_params["keltner_flag"] and all(col in df.columns for col in ['High', 'Low', 'Close']):
+            df = calculate_keltner_channels(df, indicator_params["keltner_periods"], indicator_params["keltner_atr"], indicator_params["keltner_multiplier"])
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['Keltner_Upper'],
+                name=f'Keltner Upper ({indicator_params["keltner_periods"]}, {indicator_params["keltner_multiplier"]})',
+                line=dict(color='rgba(0, 150, 150, 0.6)')
+            ))
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['Keltner_Middle'],
+                name='Keltner Middle',
+                line=dict(color='rgba(0, 150, 150, 0.6)', dash='dash')
+            ))
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['Keltner_Lower'],
+                name=f'Keltner Lower ({indicator_params["keltner_periods"]}, {indicator_params["keltner_multiplier"]})',
+                line=dict(color='rgba(0, 150, 150, 0.6)')
+            ))
+
+        # Add Parabolic SAR if requested
+        if indicator_params["psar_flag"] and all(col in df.columns for col in ['High', 'Low']):
+            df = calculate_psar(df, indicator_params["psar_step"], indicator_params["psar_max_step"])
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['PSAR'],
+                name='Parabolic SAR',
+                mode='markers',
+                marker=dict(color='black', size=3)
+            ))
+
+        # Add ADX / DMI if requested
+        if indicator_params["adx_flag"] and all(col in df.columns for col in ['High', 'Low', 'Close']):
+            df = calculate_adx(df, indicator_params["adx_period"])
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['ADX'],
+                name=f'ADX ({indicator_params["adx_period"]})',
+                yaxis='y8',
+                line=dict(color='black')
+            ))
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['+DI'],
+                name='+DI',
+                yaxis='y8',
+                line=dict(color='green')
+            ))
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['-DI'],
+                name='-DI',
+                yaxis='y8',
+                line=dict(color='red')
+            ))
+            fig.update_layout(
+                yaxis8=dict(
+                    title="ADX",
+                    anchor="free",
+                    overlaying="y",
+                    side="right",
+                    position=0.75,
+                    range=[0, 100]
+                )
+            )
+
+        # Add Williams %R if requested
+        if indicator_params["willr_flag"] and all(col in df.columns for col in ['High', 'Low', 'Close']):
+            df = calculate_williams_r(df, indicator_params["willr_period"])
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['Williams_%R'],
+                name=f'Williams %R ({indicator_params["willr_period"]})',
+                yaxis='y9',
+                line=dict(color='darkcyan')
+            ))
+            fig.update_layout(
+                yaxis9=dict(
+                    title="Williams %R",
+                    anchor="free",
+                    overlaying="y",
+                    side="right",
+                    position=0.70,
+                    range=[-100, 0]
+                )
+            )
+
+        # Add CCI if requested
+        if indicator_params["cci_flag"] and all(col in df.columns for col in ['High', 'Low', 'Close']):
+            df = calculate_cci(df, indicator_params["cci_period"])
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['CCI'],
+                name=f'CCI ({indicator_params["cci_period"]})',
+                yaxis='y10',
+                line=dict(color='darkmagenta')
+            ))
+            fig.update_layout(
+                yaxis10=dict(
+                    title="CCI",
+                    anchor="free",
+                    overlaying="y",
+                    side="right",
+                    position=0.65
+                )
+            )
+
+        # Add MFI if requested
+        if indicator_params["mfi_flag"] and all(col in df.columns for col in ['High', 'Low', 'Close', 'Volume']):
+            df = calculate_mfi(df, indicator_params["mfi_period"])
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['MFI'],
+                name=f'MFI ({indicator_params["mfi_period"]})',
+                yaxis='y11',
+                line=dict(color='darkolivegreen')
+            ))
+            fig.update_layout(
+                yaxis11=dict(
+                    title="MFI",
+                    anchor="free",
+                    overlaying="y",
+                    side="right",
+                    position=0.60,
+                    range=[0, 100]
+                )
+            )
+
         # Update layout
         fig.update_layout(
             title=title_str,
@@ -0,0 +1,216 @@
+"""
+Host-level, read-only price store shared by every app process through memory-mapped files.
+
+Usage: python price_store.py build [universe] [--start 2020-01-01] [--float32] [--dir PATH]
+       python price_store.py info [--dir PATH]
+
+Set PRICE_STORE_DIR (default /dev/shm/stock-price-store) for load_data to serve stored
+tickers straight from the store instead of keeping a per-process copy.
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+# tmpfs keeps the mapped pages in RAM; any directory works
+STORE_DIR = os.environ.get(
+    "PRICE_STORE_DIR",
+    "/dev/shm/stock-price-store" if os.path.isdir("/dev/shm") else "/tmp/stock-price-store",
+)
+
+PRICE_FIELDS = ["Open", "High", "Low", "Close"]
+
+
+def build_store(panel, path=None, price_dtype="float64", volume_dtype="int64", quality=None, start=None):
+    """
+    Writes a (field, ticker) panel as a new store version and makes it current.
+
+    Every field is one (ticker, time) array in its own .npy file, so a ticker's history
+    is contiguous. Prices use price_dtype (float32 halves the footprint), Volume
+    volume_dtype, and all tickers share one int64 (ns) date index. Missing prices are NaN,
+    missing volume 0. The store covers [start, build time): `start` is the date the panel
+    was fetched from (default its first bar). Returns the version name.
+    """
+    path = path or STORE_DIR
+    built = datetime.datetime.now(datetime.timezone.utc)
+    version = built.strftime("%Y%m%dT%H%M%S%f")
+    target = os.path.join(path, version)
+    os.makedirs(target)
+
+    tickers = list(panel["Close"].columns)
+    for field in PRICE_FIELDS:
+        np.save(os.path.join(target, f"{field}.npy"),
+                panel[field][tickers].to_numpy(dtype=price_dtype).T.copy())
+    np.save(os.path.join(target, "Volume.npy"),
+            panel["Volume"][tickers].fillna(0).to_numpy(dtype=volume_dtype).T.copy())
+    index = panel.index.as_unit("ns")
+    np.save(os.path.join(target, "dates.npy"), (index.tz_convert("UTC") if index.tz else index).asi8)
+    with open(os.path.join(target, "meta.json"), "w") as f:
+        json.dump({
+            "tickers": tickers,
+            "tz": str(index.tz) if index.tz else None,
+            "start": str(pd.Timestamp(start).date()) if start is not None else str(index[0].date()),
+            "built": built.isoformat(),
+            "quality": quality or {},
+        }, f)
+
+    # Swap the CURRENT pointer atomically; attached readers keep their old mapping
+    tmp_pointer = os.path.join(path, ".CURRENT.tmp")
+    with open(tmp_pointer, "w") as f:
+        f.write(version)
+    os.replace(tmp_pointer, os.path.join(path, "CURRENT"))
+    return version
+
+
+def prune_versions(path=None, keep=2):
+    """Deletes all but the newest `keep` versions. Processes still mapping them keep their pages."""
+    path = path or STORE_DIR
+    versions = sorted(name for name in os.listdir(path) if not name.startswith(".") and name != "CURRENT")
+    for version in versions[:-keep]:
+        shutil.rmtree(os.path.join(path, version))
+
+
+class PriceStore:
+    """
+    Read-only view of one store version. Arrays are np.load(mmap_mode="r") views, so
+    attaching costs no deserialization and the pages are shared by every process.
+    """
+
+    def __init__(self, path, version):
+        self.path = path
+        self.version = version
+        directory = os.path.join(path, version)
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        self.tickers = meta["tickers"]
+        self.quality = meta["quality"]
+        self._positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.fields = {
+            field: np.load(os.path.join(directory, f"{field}.npy"), mmap_mode="r")
+            for field in PRICE_FIELDS + ["Volume"]
+        }
+        dates = np.load(os.path.join(directory, "dates.npy"), mmap_mode="r")
+        index = pd.DatetimeIndex(dates.view("datetime64[ns]"), name="Date")
+        self.index = index.tz_localize("UTC").tz_convert(meta["tz"]) if meta["tz"] else index
+        # Stores built before coverage was recorded cover their first bar up to the version's build time
+        self.start = self._timestamp(meta.get("start") or self.index[0].date())
+        built = pd.Timestamp(meta["built"]) if "built" in meta else pd.to_datetime(
+            version, format="%Y%m%dT%H%M%S%f", utc=True)
+        self.built = built.tz_convert(self.index.tz)
+
+    @classmethod
+    def attach(cls, path=None):
+        """Attaches to the current version of a store, or returns None if there is none."""
+        path = path or STORE_DIR
+        try:
+            with open(os.path.join(path, "CURRENT")) as f:
+                return cls(path, f.read().strip())
+        except FileNotFoundError:
+            return None
+
+    def __contains__(self, ticker):
+        return ticker in self._positions
+
+    def _timestamp(self, value):
+        return pd.Timestamp(value, tz=self.index.tz)
+
+    def covers(self, start, end):
+        """
+        True if the store holds every bar in [start, end). An open start or end is never
+        covered: bars before the build's start date or after the build are not stored.
+        """
+        if start is None or end is None:
+            return False
+        return self._timestamp(start) >= self.start and self._timestamp(end) <= self.built
+
+    def _rows(self, start, end):
+        lo = 0 if start is None else self.index.searchsorted(self._timestamp(start))
+        hi = len(self.index) if end is None else self.index.searchsorted(self._timestamp(end))
+        return slice(lo, hi)
+
+    def arrays(self, ticker, start=None, end=None):
+        """Returns {field: 1-D view} for one ticker, sliced to [start, end)."""
+        position, rows = self._positions[ticker], self._rows(start, end)
+        return {field: values[position, rows] for field, values in self.fields.items()}
+
+    def panel(self, field, start=None, end=None):
+        """Returns a (time, ticker) view of one field across the universe."""
+        return self.fields[field][:, self._rows(start, end)].T
+
+    def frame(self, ticker, start=None, end=None):
+        """
+        Returns a DataFrame for one ticker whose columns are views into the store.
+        Only bars held by the store are returned; check covers(start, end) first.
+        Indicator functions can add columns to it; the stored prices are never modified.
+        Leading and trailing bars without prices (before listing, after delisting) are dropped.
+        """
+        arrays = self.arrays(ticker, start, end)
+        rows = self._rows(start, end)
+        valid = np.flatnonzero(~np.isnan(arrays["Close"]))
+        keep = slice(valid[0], valid[-1] + 1) if len(valid) else slice(0, 0)
+        df = pd.DataFrame(
+            {field: values[keep] for field, values in arrays.items()},
+            index=self.index[rows][keep],
+            copy=False,
+        )
+        df.attrs["quality"] = self.quality.get(ticker, {})
+        return df
+
+
+_attached = None
+_attach_lock = threading.Lock()
+
+
+def get_price_store(path=None):
+    """
+    Returns this process's attachment to the store, re-attaching when a newer
+    version has been built. Returns None if no store exists.
+    """
+    global _attached
+    path = path or STORE_DIR
+    try:
+        with open(os.path.join(path, "CURRENT")) as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    with _attach_lock:
+        if _attached is None or _attached.path != path or _attached.version != version:
+            _attached = PriceStore(path, version)
+        return _attached
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or inspect the shared price store.")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("universe", nargs="?", default="S&P 500")
+    parser.add_argument("--start", default="2020-01-01")
+    parser.add_argument("--float32", action="store_true", help="store prices as float32")
+    parser.add_argument("--dir", default=STORE_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        from constituents import load_snapshot
+        from data_loader import fetch_data
+        from normalize import check_quality, to_panel
+
+        tickers = load_snapshot(args.universe)["Symbol"].to_list()
+        panel = to_panel(fetch_data(tickers, args.start, None), tickers[0])
+        quality = {ticker: check_quality(panel.xs(ticker, axis=1, level="Ticker").dropna(subset=["Close"]))
+                   for ticker in panel["Close"].columns}
+        version = build_store(panel, args.dir, "float32" if args.float32 else "float64",
+                              quality=quality, start=args.start)
+        prune_versions(args.dir)
+        print(f"Built {version} with {len(panel['Close'].columns)} tickers x {len(panel)} bars")
+    else:
+        store = PriceStore.attach(args.dir)
+        if store is None:
+            raise SystemExit(f"No price store at {args.dir}")
+        size = sum(values.nbytes for values in store.fields.values()) + store.index.nbytes
+        print(f"Version {store.version}: {len(store.tickers)} tickers x {len(store.index)} bars "
+              f"covering {store.start.date()} to {store.built:%Y-%m-%d %H:%M %Z}, "
+              f"{size / 1024 ** 2:.1f} MB, prices {store.fields['Close'].dtype}")
@@ -0,0 +1,219 @@
+"""
+Historical market replay: a data provider that releases stored or synthetic bars over time.
+
+Run the app against a replay:
+    STOCK_DATA_PROVIDER=replay REPLAY_SPEED=100 REPLAY_SEED=7 streamlit run Home.py
+(REPLAY_DIR=<dir of TICKER.csv/.parquet files> replays stored history instead of synthetic bars.)
+
+Measure the indicator and chart update path bar by bar:
+    python replay.py [--tickers AAPL,MSFT] [--bars 200] [--seed 7] [--dir history/]
+"""
+import argparse
+import os
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from patterns import PATTERNS
+
+# Bars released before the replay clock starts, so indicators have history to work with
+WARMUP_BARS = 250
+
+
+def synthetic_history(tickers, bars=1000, start="2023-01-02", seed=0):
+    """
+    Generates daily OHLCV bars as a geometric random walk per ticker.
+    Each ticker's series depends only on the seed and its symbol, not on which other
+    tickers are requested.
+    """
+    index = pd.bdate_range(start, periods=bars, name="Date")
+    history = {}
+    for ticker in tickers:
+        rng = np.random.default_rng([seed, zlib.crc32(ticker.encode())])
+        returns = rng.normal(0.0003, 0.015, bars)
+        close = (20 + 180 * rng.random()) * np.exp(np.cumsum(returns))
+        open_ = close * np.exp(rng.normal(0, 0.005, bars))
+        spread = close * np.abs(rng.normal(0, 0.01, bars))
+        history[ticker] = pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) + spread,
+            "Low": np.minimum(open_, close) - spread,
+            "Close": close,
+            "Volume": rng.integers(100_000, 5_000_000, bars),
+        }, index=index)
+    return history
+
+
+def load_history(directory):
+    """Reads stored history from <TICKER>.csv or <TICKER>.parquet files (Date index)."""
+    history = {}
+    for name in sorted(os.listdir(directory)):
+        ticker, extension = os.path.splitext(name)
+        path = os.path.join(directory, name)
+        if extension == ".parquet":
+            history[ticker] = pd.read_parquet(path)
+        elif extension == ".csv":
+            history[ticker] = pd.read_csv(path, index_col=0, parse_dates=True)
+    return history
+
+
+class ReplayProvider:
+    """
+    Bar source for data_loader.set_data_provider that reveals history over time.
+
+    `speed` multiplies the data's own cadence: at 1x a daily bar arrives once a day,
+    at 1000x every 86.4 s. `bar_seconds` overrides that cadence (e.g. 1.0 replays one
+    bar per second at 1x). speed=0 pauses the clock; advance() then steps manually.
+    Unknown tickers get synthetic bars derived from `seed`, so runs are reproducible.
+    """
+
+    split_adjusted = True
+
+    def __init__(self, history=None, speed=1.0, bar_seconds=None, warmup_bars=WARMUP_BARS,
+                 seed=0, clock=time.monotonic):
+        # Stored history may carry a timezone; replay compares against naive dates
+        self.history = {
+            ticker: frame.tz_localize(None) if getattr(frame.index, "tz", None) is not None else frame
+            for ticker, frame in (history or {}).items()
+        }
+        self.speed = speed
+        self.seed = seed
+        self.warmup_bars = warmup_bars
+        self.clock = clock
+        self._started = clock()
+        self._stepped = 0
+        if bar_seconds is None:
+            sample = next(iter(self.history.values()), None)
+            spacing = sample.index.to_series().diff().median() if sample is not None and len(sample) > 1 else None
+            bar_seconds = spacing.total_seconds() if spacing is not None else 86400.0
+        self.bar_seconds = bar_seconds
+
+    def _frame(self, ticker):
+        if ticker not in self.history:
+            # Synthetic warm-up history ends today, later bars continue into the future
+            start = pd.Timestamp.today().normalize() - pd.offsets.BDay(self.warmup_bars - 1)
+            self.history.update(synthetic_history([ticker], start=start, seed=self.seed))
+        return self.history[ticker]
+
+    @property
+    def version(self):
+        """Number of bars released so far; load_data re-fetches whenever it changes."""
+        elapsed = (self.clock() - self._started) * self.speed
+        return self.warmup_bars + self._stepped + int(elapsed // self.bar_seconds)
+
+    def advance(self, bars=1):
+        """Releases `bars` more bars immediately."""
+        self._stepped += bars
+
+    def latest_time(self, ticker):
+        """Timestamp of the newest released bar for a ticker."""
+        frame = self._frame(ticker)
+        return frame.index[min(self.version, len(frame)) - 1]
+
+    def __call__(self, symbol, start, end):
+        """
+        Returns the released bars in [start, end) in the (Price, Ticker) layout of yfinance.
+        An end of today or later means "up to now", which in a replay is the newest released
+        bar, so synthetic bars released after the warm-up (dated after today) are included.
+        """
+        tickers = [symbol] if isinstance(symbol, str) else list(symbol)
+        released = self.version
+        if end is not None and pd.Timestamp(end) >= pd.Timestamp.today().normalize():
+            end = None
+        frames = {}
+        for ticker in tickers:
+            frame = self._frame(ticker).iloc[:released]
+            if start is not None:
+                frame = frame[frame.index >= pd.Timestamp(start)]
+            if end is not None:
+                frame = frame[frame.index < pd.Timestamp(end)]
+            frames[ticker] = frame
+        return pd.concat(frames, axis=1, names=["Ticker", "Price"]).swaplevel(axis=1)
+
+
+def replay_from_env():
+    """Builds a ReplayProvider from REPLAY_DIR, REPLAY_SPEED, REPLAY_BAR_SECONDS and REPLAY_SEED."""
+    directory = os.environ.get("REPLAY_DIR")
+    bar_seconds = os.environ.get("REPLAY_BAR_SECONDS")
+    return ReplayProvider(
+        history=load_history(directory) if directory else None,
+        speed=float(os.environ.get("REPLAY_SPEED", "1")),
+        bar_seconds=float(bar_seconds) if bar_seconds else None,
+        seed=int(os.environ.get("REPLAY_SEED", "0")),
+    )
+
+
+def measure_update_latency(provider, tickers, indicator_params, bars=100, start=None, end=None):
+    """
+    Steps a paused replay one bar at a time and times the page's update path per ticker:
+    load_data, then plot_stock_chart (which computes the indicators and builds the figure).
+    indicators_ms times the indicator math alone on a copy of the frame.
+    Returns one row per (bar, ticker) with timings in milliseconds.
+    """
+    import data_loader
+    from export import add_indicator_columns
+    from plotting import plot_stock_chart
+
+    previous = data_loader.get_data_provider()
+    data_loader.set_data_provider(provider)
+    names = {ticker: ticker for ticker in tickers}
+    rows = []
+    try:
+        for bar in range(bars):
+            provider.advance()
+            for ticker in tickers:
+                t0 = time.perf_counter()
+                df = data_loader.load_data(ticker, start, end)
+                t1 = time.perf_counter()
+                add_indicator_columns(df.copy(), indicator_params)
+                t2 = time.perf_counter()
+                plot_stock_chart(df, ticker, names, indicator_params)
+                t3 = time.perf_counter()
+                rows.append({
+                    "bar": bar,
+                    "ticker": ticker,
+                    "load_ms": (t1 - t0) * 1000,
+                    "indicators_ms": (t2 - t1) * 1000,
+                    "chart_ms": (t3 - t2) * 1000,
+                    "total_ms": (t1 - t0 + t3 - t2) * 1000,
+                })
+    finally:
+        data_loader.set_data_provider(previous)
+    return pd.DataFrame(rows)
+
+
+ALL_INDICATORS = {
+    "volume_flag": True, "sma_flag": True, "sma_periods": 20,
+    "bb_flag": True, "bb_periods": 20, "bb_std": 2,
+    "rsi_flag": True, "rsi_periods": 14, "rsi_upper": 70, "rsi_lower": 30,
+    "macd_flag": True, "macd_fast": 12, "macd_slow": 26, "macd_signal": 9,
+    "atr_flag": True, "atr_period": 14, "obv_flag": True,
+    "stoch_flag": True, "stoch_k": 14, "stoch_d": 3,
+    "ma_flag": True, "ma_type": "HMA", "ma_periods": 20,
+    "vwap_flag": True, "vwap_period": 0, "adx_flag": True, "adx_period": 14,
+    "ichimoku_flag": True, "ichimoku_conversion": 9, "ichimoku_base": 26, "ichimoku_span_b": 52,
+    "keltner_flag": True, "keltner_periods": 20, "keltner_atr": 10, "keltner_multiplier": 2.0,
+    "psar_flag": True, "psar_step": 0.02, "psar_max_step": 0.2,
+    "willr_flag": True, "willr_period": 14, "cci_flag": True, "cci_period": 20,
+    "mfi_flag": True, "mfi_period": 14,
+    "patterns_flag": True, "patterns": list(PATTERNS),
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay bars and time the indicator/chart update path.")
+    parser.add_argument("--tickers", default="AAPL")
+    parser.add_argument("--bars", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dir", help="directory of stored history; synthetic bars if omitted")
+    args = parser.parse_args()
+
+    # plot_stock_chart runs outside a Streamlit session here; silence its bare-mode warnings
+    import logging
+    logging.disable(logging.WARNING)
+    replay = ReplayProvider(load_history(args.dir) if args.dir else None, speed=0, seed=args.seed)
+    timings = measure_update_latency(replay, args.tickers.split(","), ALL_INDICATORS, args.bars)
+    print(timings[["load_ms", "indicators_ms", "chart_ms", "total_ms"]]
+          .describe(percentiles=[0.5, 0.95, 0.99]).round(2).to_string())
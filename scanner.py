@@ -0,0 +1,391 @@
+"""
+Background signal scanner: re-evaluates alert rules over watchlists on a schedule.
+
+Usage: python scanner.py config.json
+
+Example config:
+{
+    "interval": 60,
+    "watchlists": {"sp500": "S&P 500", "mega": ["AAPL", "MSFT", "NVDA"]},
+    "rules": [
+        {"name": "RSI oversold", "type": "rsi_cross", "watchlist": "sp500", "period": 14, "level": 30, "direction": "down"},
+        {"name": "MACD bullish", "type": "macd_cross", "watchlist": "mega", "direction": "up"},
+        {"name": "BB breakout", "type": "bollinger_break", "watchlist": "mega", "period": 20, "std_dev": 2, "direction": "up"},
+        {"name": "Stoch overbought", "type": "stochastic_extreme", "watchlist": "mega", "level": 80, "direction": "up"}
+    ],
+    "sinks": [{"type": "file", "path": "alerts.jsonl"}, {"type": "webhook", "url": "http://localhost:9000/alerts"}]
+}
+"""
+import datetime
+import json
+import queue
+import sys
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from data_loader import get_data_provider
+from normalize import EXCHANGE_TZ, PRICE_COLUMNS, NYSEHolidayCalendar, adjust_prices, normalize_ohlcv, to_panel
+from indicators import macd_values, rsi_values, stochastic_values, bollinger_values
+
+# Bars kept per ticker; enough history for every rule's rolling windows and EMAs to settle
+LOOKBACK_BARS = 300
+
+# Regular NYSE session, and how long after the close a daily bar may still be revised
+MARKET_OPEN = datetime.time(9, 30)
+MARKET_CLOSE = datetime.time(16, 0)
+SETTLE_DELAY = datetime.timedelta(minutes=30)
+
+
+def _crossed(series, level, direction):
+    """
+    Tells, per ticker, whether `series` crossed `level` between the last two bars.
+    `series` is a time x ticker frame; `level` a scalar or a frame of the same shape.
+    """
+    diff = series - level
+    prev, last = diff.iloc[-2], diff.iloc[-1]
+    if direction == "up":
+        return (prev <= 0) & (last > 0)
+    return (prev >= 0) & (last < 0)
+
+
+def _rsi_cross(panel, rule):
+    rsi = rsi_values(panel["Close"], rule.get("period", 14))
+    return _crossed(rsi, rule["level"], rule["direction"]), rsi.iloc[-1]
+
+
+def _macd_cross(panel, rule):
+    _, _, macd, signal, _ = macd_values(
+        panel["Close"], rule.get("fast", 12), rule.get("slow", 26), rule.get("signal", 9)
+    )
+    return _crossed(macd, signal, rule["direction"]), macd.iloc[-1]
+
+
+def _bollinger_break(panel, rule):
+    _, _, upper, lower = bollinger_values(panel["Close"], rule.get("period", 20), rule.get("std_dev", 2))
+    band = upper if rule["direction"] == "up" else lower
+    return _crossed(panel["Close"], band, rule["direction"]), panel["Close"].iloc[-1]
+
+
+def _stochastic_extreme(panel, rule):
+    _, _, k, _ = stochastic_values(
+        panel["High"], panel["Low"], panel["Close"], rule.get("k", 14), rule.get("d", 3)
+    )
+    default_level = 80 if rule["direction"] == "up" else 20
+    return _crossed(k, rule.get("level", default_level), rule["direction"]), k.iloc[-1]
+
+
+RULE_TYPES = {
+    "rsi_cross": _rsi_cross,
+    "macd_cross": _macd_cross,
+    "bollinger_break": _bollinger_break,
+    "stochastic_extreme": _stochastic_extreme,
+}
+
+
+class FileSink:
+    """Appends alerts to a JSON-lines file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, alert):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(alert) + "\n")
+
+
+class WebhookSink:
+    """POSTs each alert as JSON to a URL."""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alert):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(alert).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        urllib.request.urlopen(request, timeout=self.timeout).close()
+
+
+class QueueSink:
+    """Puts alerts on an in-process queue for another thread to consume."""
+
+    def __init__(self, alert_queue=None):
+        self.queue = alert_queue if alert_queue is not None else queue.Queue()
+
+    def send(self, alert):
+        self.queue.put(alert)
+
+
+SINK_TYPES = {"file": FileSink, "webhook": WebhookSink, "queue": QueueSink}
+
+
+class ActiveProvider:
+    """
+    Raw bars from data_loader's active provider (see set_data_provider), bypassing the page cache.
+    Forwards the provider's `version` and `split_adjusted` so the scanner can tell when to pull
+    and how to adjust.
+    """
+
+    @property
+    def version(self):
+        return getattr(get_data_provider(), "version", None)
+
+    @property
+    def split_adjusted(self):
+        return getattr(get_data_provider(), "split_adjusted", True)
+
+    def __call__(self, tickers, start, end):
+        return get_data_provider()(list(tickers), start, end)
+
+
+def last_session(now):
+    """
+    Returns the date of the latest NYSE session that has opened by `now` and the UTC time
+    its daily bar settles (SETTLE_DELAY after the close). Early closes count as full days.
+    """
+    local = pd.Timestamp(now).tz_convert(EXCHANGE_TZ)
+    holidays = NYSEHolidayCalendar().holidays(local.date() - datetime.timedelta(days=14), local.date())
+    day = local.date()
+    if local.time() < MARKET_OPEN:
+        day -= datetime.timedelta(days=1)
+    while day.weekday() >= 5 or pd.Timestamp(day) in holidays:
+        day -= datetime.timedelta(days=1)
+    settles = pd.Timestamp.combine(day, MARKET_CLOSE).tz_localize(EXCHANGE_TZ) + SETTLE_DELAY
+    return day, settles.tz_convert("UTC")
+
+
+class Scanner:
+    """
+    Holds watchlists, alert rules and the last LOOKBACK_BARS bars of every watched ticker.
+    Each scan pulls only tickers that can have new bars, from their last stored date on, and
+    re-evaluates only the tickers whose bars changed, across all of them at once.
+
+    `provider` is called as provider(tickers, start, end) and returns raw bars in any layout
+    normalize_ohlcv accepts. If it exposes `version`, it is only pulled when that changes;
+    otherwise the NYSE calendar decides which tickers can have new bars.
+    """
+
+    def __init__(self, watchlists, rules, sinks, provider=None):
+        self.watchlists = {}
+        for name, members in watchlists.items():
+            if isinstance(members, str):
+                from constituents import load_snapshot
+                members = load_snapshot(members)["Symbol"].to_list()
+            self.watchlists[name] = list(members)
+        for rule in rules:
+            if rule["type"] not in RULE_TYPES:
+                raise ValueError(f"Unknown rule type: {rule['type']}")
+        self.rules = rules
+        self.sinks = sinks
+        self.provider = provider if provider is not None else ActiveProvider()
+        self.tickers = sorted({ticker for members in self.watchlists.values() for ticker in members})
+        self.panel = None
+        self._fired = set()
+        self._version = None
+        # ticker -> when it was last pulled
+        self._pulled = {}
+        # ticker -> Adj Close / Close on its last stored bar, as of the pull that delivered it
+        self._factors = pd.Series(dtype="float64")
+        # Last raw incremental pull; an identical one is not normalized again
+        self._last_pull = None
+
+    def _last_dates(self):
+        """Date of each stored ticker's last close (NaT if it has none)."""
+        close = self.panel["Close"]
+        valid = close.notna().to_numpy()
+        rows = len(close) - 1 - np.argmax(valid[::-1], axis=0)
+        dates = pd.Series(close.index[rows], index=close.columns)
+        return dates.where(valid.any(axis=0))
+
+    def _due(self, now):
+        """Tickers that can have new or revised bars since they were last pulled."""
+        version = getattr(self.provider, "version", None)
+        if version is not None:
+            return list(self.tickers) if version != self._version else []
+        if self.panel is None or self.panel.empty:
+            return list(self.tickers)
+        session, settles = last_session(now)
+        last = self._last_dates().reindex(self.tickers)
+        pulled = pd.Series(self._pulled, dtype="datetime64[ns, UTC]").reindex(self.tickers)
+        # A ticker is done once it was pulled after its latest session's bar settled
+        done = (last.dt.date >= session) & (pulled >= settles)
+        return done.index[~done].to_list()
+
+    def _adjust(self, data, tickers):
+        """Normalizes and adjusts a raw pull; returns the panel and its Adj Close / Close per bar."""
+        # A single ticker comes back flat
+        bars = to_panel(normalize_ohlcv(data), tickers[0])
+        panel = adjust_prices(bars, split_adjusted=getattr(self.provider, "split_adjusted", True))
+        return panel, panel["Close"] / bars["Close"]
+
+    def _rescale(self, factors):
+        """
+        Brings stored history in line with a pull's adjustment. A dividend (or split) inside the
+        pull changes the Adj Close / Close ratio of the overlapping bar, and every stored bar
+        before it needs the same change. Returns the tickers that were rescaled.
+        """
+        last = self._last_dates().reindex(factors.columns)
+        rows = factors.index.get_indexer(last)
+        new = factors.to_numpy()[np.maximum(rows, 0), np.arange(factors.shape[1])]
+        scale = new / self._factors.reindex(factors.columns).to_numpy()
+        scale = np.where((rows >= 0) & np.isfinite(scale) & ~np.isclose(scale, 1.0, rtol=1e-9, atol=0), scale, 1.0)
+        if (scale == 1.0).all():
+            return []
+        tickers = factors.columns[scale != 1.0]
+        scale = pd.Series(scale, index=factors.columns)[tickers]
+        before = self.panel.index.to_numpy()[:, None] < last[tickers].to_numpy()[None, :]
+        for field in PRICE_COLUMNS:
+            if field in self.panel.columns.get_level_values(0):
+                columns = [(field, ticker) for ticker in tickers]
+                self.panel[columns] = self.panel[columns].to_numpy() * np.where(before, scale.to_numpy(), 1.0)
+        return tickers.to_list()
+
+    def _merge(self, new):
+        """Overwrites the stored bars with the pull's, adding any new dates and tickers."""
+        index = self.panel.index.union(new.index)
+        fields = {}
+        for field in self.panel.columns.get_level_values(0).unique():
+            stored = self.panel[field]
+            frame = stored.reindex(index=index, columns=stored.columns.union(new[field].columns, sort=False))
+            if field in new.columns.get_level_values(0):
+                values = frame.to_numpy(copy=True)
+                rows, columns = index.get_indexer(new.index), frame.columns.get_indexer(new[field].columns)
+                values[np.ix_(rows, columns)] = new[field].to_numpy()
+                frame = pd.DataFrame(values, index=index, columns=frame.columns)
+            fields[field] = frame
+        return pd.concat(fields, axis=1, names=["Price", "Ticker"])
+
+    def _store_factors(self, factors):
+        valid = factors.notna().to_numpy()
+        rows = len(factors) - 1 - np.argmax(valid[::-1], axis=0)
+        latest = pd.Series(factors.to_numpy()[rows, np.arange(factors.shape[1])], index=factors.columns)
+        self._factors = pd.concat([self._factors.drop(latest.index, errors="ignore"), latest[valid.any(axis=0)]])
+
+    def update(self, now=None):
+        """Pulls new bars and returns the tickers whose data changed."""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        due = self._due(now)
+        self._version = getattr(self.provider, "version", None)
+        if not due:
+            return []
+        end = now.date() + datetime.timedelta(days=1)
+        lookback = now.date() - datetime.timedelta(days=LOOKBACK_BARS * 7 // 5 + 10)
+        if self.panel is None or self.panel.empty:
+            data = self.provider(due, lookback, end)
+            self._pulled.update(dict.fromkeys(due, pd.Timestamp(now)))
+            if data.empty:
+                return []
+            new, factors = self._adjust(data, due)
+            self.panel = new.tail(LOOKBACK_BARS)
+            self._store_factors(factors)
+            return sorted(set(new.columns.get_level_values("Ticker")))
+
+        # Tickers with stored bars re-fetch from their last one (it may still have been forming);
+        # tickers without any get the full lookback
+        last = self._last_dates().reindex(due)
+        pulls = [
+            (last.index[last.notna()].to_list(), last.min().date() if last.notna().any() else None, True),
+            (last.index[last.isna()].to_list(), lookback, False),
+        ]
+        changed = set()
+        for tickers, start, incremental in pulls:
+            if not tickers:
+                continue
+            data = self.provider(tickers, start, end)
+            self._pulled.update(dict.fromkeys(tickers, pd.Timestamp(now)))
+            if data.empty:
+                continue
+            if incremental:
+                # An identical pull has no new bars: skip normalizing, adjusting and diffing it
+                if self._last_pull is not None and data.equals(self._last_pull):
+                    continue
+                self._last_pull = data
+            new, factors = self._adjust(data, tickers)
+            changed.update(self._rescale(factors))
+
+            old = self.panel.reindex(index=new.index, columns=new.columns)
+            unchanged = (old == new) | (old.isna() & new.isna())
+            differs = (~unchanged).any(axis=0).groupby(level="Ticker").any()
+            changed.update(differs[differs].index)
+            self.panel = self._merge(new).tail(LOOKBACK_BARS)
+            self._store_factors(factors)
+        return sorted(changed)
+
+    def evaluate(self, tickers):
+        """Evaluates every rule for the given tickers; returns the new alerts."""
+        alerts = []
+        for rule in self.rules:
+            members = [ticker for ticker in self.watchlists[rule["watchlist"]] if ticker in tickers]
+            if not members:
+                continue
+            panel = self.panel.loc[:, self.panel.columns.get_level_values("Ticker").isin(members)]
+            if len(panel) < 2:
+                continue
+            triggered, values = RULE_TYPES[rule["type"]](panel, rule)
+            bar_time = panel.index[-1].isoformat()
+            for ticker in triggered[triggered].index:
+                key = (rule["name"], ticker, bar_time)
+                # A forming bar is re-evaluated on every scan; alert on it only once
+                if key in self._fired:
+                    continue
+                self._fired.add(key)
+                alerts.append({
+                    "rule": rule["name"],
+                    "type": rule["type"],
+                    "ticker": ticker,
+                    "bar_time": bar_time,
+                    "value": round(float(values[ticker]), 4),
+                    "direction": rule["direction"],
+                })
+        return alerts
+
+    def scan(self, now=None):
+        """Runs one update/evaluate cycle and delivers the alerts to every sink."""
+        changed = self.update(now)
+        alerts = self.evaluate(set(changed)) if changed else []
+        for alert in alerts:
+            for sink in self.sinks:
+                try:
+                    sink.send(alert)
+                except Exception as e:
+                    print(f"Sending alert to {type(sink).__name__} failed: {e}", file=sys.stderr)
+        # Only alerts for bars still in the window can repeat
+        oldest = self.panel.index[0].isoformat() if self.panel is not None and len(self.panel) else ""
+        self._fired = {key for key in self._fired if key[2] >= oldest}
+        return alerts
+
+    def run_forever(self, interval=60):
+        """Scans every `interval` seconds, keeping to the schedule even if a scan runs long."""
+        next_run = time.monotonic()
+        while True:
+            started = time.monotonic()
+            try:
+                alerts = self.scan()
+                print(f"Scanned {len(self.tickers)} tickers in {time.monotonic() - started:.2f}s, {len(alerts)} alerts")
+            except Exception as e:
+                print(f"Scan failed: {e}", file=sys.stderr)
+            next_run += interval
+            time.sleep(max(0.0, next_run - time.monotonic()))
+
+
+def scanner_from_config(config):
+    """Builds a Scanner from a config dict (see the module docstring)."""
+    sinks = []
+    for sink in config.get("sinks", [{"type": "file", "path": "alerts.jsonl"}]):
+        options = {key: value for key, value in sink.items() if key != "type"}
+        sinks.append(SINK_TYPES[sink["type"]](**options))
+    return Scanner(config["watchlists"], config["rules"], sinks)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit(__doc__)
+    with open(sys.argv[1]) as f:
+        config = json.load(f)
+    scanner_from_config(config).run_forever(config.get("interval", 60))
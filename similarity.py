@@ -0,0 +1,207 @@
+"""
+Similar-pattern search over z-normalized windows of close prices.
+
+A SimilarityIndex holds a universe's closes as one (ticker, time) array plus running
+sums for the mean and spread of every window. A query is z-normalized and slid over
+every ticker at once with an FFT cross-correlation (the MASS distance profile), so
+searching 500 tickers x 5 years takes milliseconds. The data's spectrum is computed
+once per update; new bars are appended without recomputing the existing windows.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Indexes kept per process (one per universe, window length and history range), least recently used dropped first
+MAX_INDEXES = int(os.environ.get("SIMILARITY_MAX_INDEXES", 4))
+
+
+def _fft_length(n):
+    """Smallest power of two >= n."""
+    return 1 << int(n - 1).bit_length()
+
+
+class SimilarityIndex:
+    """
+    Nearest-neighbour index over every `window`-bar stretch of a (field, ticker) panel's closes.
+    Matches are ranked by z-normalized Euclidean distance, i.e. by the shape of the
+    window regardless of its price level and volatility.
+    """
+
+    def __init__(self, panel, window=60):
+        close = panel["Close"]
+        self.window = window
+        self.tickers = list(close.columns)
+        self._positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.dates = close.index[:0]
+        self.close = np.empty((len(self.tickers), 0))
+        # Running sums (with a leading zero column) of the prices, their squares and missing bars
+        self._sums = [np.zeros((len(self.tickers), 1)) for _ in range(3)]
+        self._spectrum = self._std = None
+        # Updates replace the arrays while other sessions may be querying them
+        self._lock = threading.RLock()
+        first = close.bfill().iloc[0].to_numpy(dtype="float64")
+        # Prices are scaled by each ticker's first price, which keeps the running sums well conditioned
+        self._reference = np.where(np.isfinite(first) & (first > 0), first, 1.0)[:, None]
+        self.update(panel)
+
+    def update(self, panel):
+        """
+        Appends the panel's bars from the index's last date on (that bar is replaced, as it
+        may have been partial). Returns the number of bars appended; earlier windows are untouched.
+        """
+        with self._lock:
+            return self._append(panel["Close"].reindex(columns=self.tickers))
+
+    def _append(self, close):
+        if len(self.dates):
+            close = close[close.index >= self.dates[-1]]
+            if close.empty or (len(close) == 1 and np.array_equal(
+                    close.to_numpy(dtype="float64")[0], self.close[:, -1], equal_nan=True)):
+                return 0
+            self._truncate(len(self.dates) - 1)
+        if close.empty:
+            return 0
+
+        prices = close.to_numpy(dtype="float64").T
+        missing = np.isnan(prices)
+        filled = np.where(missing, 0.0, prices / self._reference)
+        self.close = np.concatenate([self.close, prices], axis=1)
+        self.dates = self.dates.append(close.index)
+        for i, part in enumerate((filled, filled ** 2, missing.astype("float64"))):
+            self._sums[i] = np.concatenate([self._sums[i], self._sums[i][:, -1:] + np.cumsum(part, axis=1)], axis=1)
+        self._spectrum = self._std = None
+        return len(close)
+
+    def _truncate(self, length):
+        self.close = self.close[:, :length]
+        self.dates = self.dates[:length]
+        self._sums = [sums[:, :length + 1] for sums in self._sums]
+        self._spectrum = self._std = None
+
+    def _window_std(self):
+        """Spread of every window (in units of the ticker's reference price); NaN where a bar is missing."""
+        if self._std is not None:
+            return self._std
+        m = self.window
+        s1, s2, gaps = (sums[:, m:] - sums[:, :-m] for sums in self._sums)
+        mean = s1 / m
+        std = np.sqrt(np.maximum(s2 / m - mean ** 2, 0.0))
+        # Flat and incomplete windows have no shape to compare
+        self._std = np.where((gaps > 0) | (std <= 1e-8 * np.abs(mean)), np.nan, std)
+        return self._std
+
+    def _sliding_dot(self, query):
+        """Dot product of the query with every window of every ticker, via the data's cached spectrum."""
+        n, m = self.close.shape[1], self.window
+        size = _fft_length(n + m)
+        if self._spectrum is None or self._spectrum[0] != size:
+            filled = np.nan_to_num(self.close / self._reference)
+            self._spectrum = (size, np.fft.rfft(filled, size, axis=1))
+        products = np.fft.irfft(self._spectrum[1] * np.fft.rfft(query[::-1], size), size, axis=1)
+        return products[:, m - 1:n]
+
+    def distance_profile(self, query):
+        """
+        z-normalized Euclidean distance from the query to every window.
+        Returns a (ticker, window end) array; column j is the window ending at bar j + window - 1.
+        """
+        query = np.asarray(query, dtype="float64")
+        if len(query) != self.window or np.isnan(query).any() or not query.std() > 0:
+            raise ValueError(f"The query must be {self.window} prices without gaps that are not all equal")
+        m = self.window
+        z = (query - query.mean()) / query.std()
+        # z sums to zero, so its dot product with a window is m * std * correlation
+        with self._lock:
+            correlation = np.clip(self._sliding_dot(z) / (m * self._window_std()), -1.0, 1.0)
+        return np.sqrt(2 * m * (1 - correlation))
+
+    def query(self, query, k=10, horizon=20, exclude=None):
+        """
+        Finds the k windows closest in shape to `query` that have `horizon` bars of
+        history after them, at most one per ticker per `window` bars.
+        `exclude` is a (ticker, end bar) whose overlapping windows are skipped.
+        Returns Ticker, Start, End, Distance, Correlation, Return (close `horizon` bars
+        after End over close at End) and Max drawdown (worst close over the horizon vs End).
+        """
+        m = self.window
+        with self._lock:
+            profile = self.distance_profile(query)
+            closes, dates = self.close, self.dates
+        last_end = closes.shape[1] - 1 - horizon
+        profile[:, max(last_end - m + 2, 0):] = np.nan
+        if exclude is not None:
+            row, column = self._positions[exclude[0]], exclude[1] - m + 1
+            profile[row, max(column - m + 1, 0):max(column + m, 0)] = np.nan
+        profile = np.where(np.isnan(profile), np.inf, profile)
+
+        rows = []
+        for _ in range(k):
+            flat = int(np.argmin(profile))
+            row, column = divmod(flat, profile.shape[1])
+            if not np.isfinite(profile[row, column]):
+                break
+            distance = profile[row, column]
+            # Suppress the trivial neighbours of this match (the same stretch shifted by a few bars)
+            profile[row, max(column - m + 1, 0):column + m] = np.inf
+            end = column + m - 1
+            prices = closes[row]
+            future = prices[end + 1:end + 1 + horizon]
+            rows.append({
+                "Ticker": self.tickers[row],
+                "Start": dates[column],
+                "End": dates[end],
+                "Distance": distance,
+                "Correlation": 1 - distance ** 2 / (2 * m),
+                "Return": prices[end + horizon] / prices[end] - 1,
+                "Max drawdown": min(np.nanmin(future) / prices[end] - 1, 0.0),
+            })
+        return pd.DataFrame(rows, columns=["Ticker", "Start", "End", "Distance", "Correlation",
+                                           "Return", "Max drawdown"])
+
+    def last_date(self, ticker):
+        """Date of the ticker's latest close."""
+        return self.dates[np.flatnonzero(~np.isnan(self.close[self._positions[ticker]]))[-1]]
+
+    def query_ticker(self, ticker, k=10, horizon=20):
+        """Finds the windows that looked most like `ticker`'s last `window` bars, excluding itself."""
+        with self._lock:
+            row, end = self._positions[ticker], int(self.dates.get_loc(self.last_date(ticker)))
+            return self.query(self.close[row, end - self.window + 1:end + 1], k, horizon, exclude=(ticker, end))
+
+    def path(self, ticker, end, after=0):
+        """
+        Closes of the window ending at date `end` followed by up to `after` bars,
+        z-normalized with the window's own mean and spread so shapes can be overlaid.
+        """
+        row, end, closes = self._positions[ticker], int(self.dates.get_loc(end)), self.close
+        window = closes[row, end - self.window + 1:end + 1]
+        values = closes[row, end - self.window + 1:end + 1 + after]
+        return (values - window.mean()) / window.std()
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_similarity_index(name, panel, window=60):
+    """
+    Returns the process-wide index for `name` (e.g. the universe) and window length,
+    building it on first use and appending the panel's new bars on later calls.
+    The index is rebuilt when the panel's tickers or first date change, e.g. when
+    more years of history are requested. At most MAX_INDEXES are kept.
+    """
+    close = panel["Close"]
+    with _indexes_lock:
+        index = _indexes.get((name, window))
+        if (index is None or index.tickers != list(close.columns)
+                or not len(index.dates) or index.dates[0] != close.index[0]):
+            index = _indexes[(name, window)] = SimilarityIndex(panel, window)
+        else:
+            index.update(panel)
+        _indexes.move_to_end((name, window))
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+        return index
@@ -0,0 +1,72 @@
+import datetime
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import constituents
+
+UNIVERSE = "S&P 500"
+
+
+def wait_for_refresh():
+    deadline = time.monotonic() + 5
+    while any(thread.name.startswith("refresh-") for thread in threading.enumerate()):
+        if time.monotonic() > deadline:
+            raise TimeoutError("refresh thread did not finish")
+        time.sleep(0.01)
+
+
+class RefreshInBackgroundTest(unittest.TestCase):
+    def setUp(self):
+        self.store = tempfile.mkdtemp()
+        patcher = mock.patch.object(constituents, "STORE_DIR", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.store)
+        constituents.read_snapshot.clear()
+        self.addCleanup(constituents.read_snapshot.clear)
+        self.snapshot = pd.DataFrame({"Symbol": ["AAPL"], "Security": ["Apple Inc."], "Sector": ["IT"]})
+        # A stale seed: its version is two days old
+        version = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=2)).strftime("%Y%m%dT%H%M%S%f")
+        os.makedirs(constituents._universe_dir(UNIVERSE))
+        self.snapshot.to_csv(os.path.join(constituents._universe_dir(UNIVERSE), f"{version}.csv"), index=False)
+
+    def test_unchanged_scrape_is_not_repeated_within_max_age(self):
+        with mock.patch.object(constituents, "fetch_universe", return_value=self.snapshot) as fetch:
+            self.assertTrue(constituents.refresh_in_background(UNIVERSE))
+            wait_for_refresh()
+            self.assertFalse(constituents.refresh_in_background(UNIVERSE))
+            wait_for_refresh()
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(len(constituents.list_versions(UNIVERSE)), 1)
+
+    def test_failed_scrape_backs_off(self):
+        with mock.patch.object(constituents, "fetch_universe", side_effect=OSError("offline")) as fetch, \
+                mock.patch("sys.stderr"):
+            self.assertTrue(constituents.refresh_in_background(UNIVERSE))
+            wait_for_refresh()
+            self.assertFalse(constituents.refresh_in_background(UNIVERSE))
+        self.assertEqual(fetch.call_count, 1)
+        # Retried once the back-off has passed, well before the snapshot age would allow
+        with mock.patch.object(constituents, "RETRY_DELAY", datetime.timedelta(0)):
+            self.assertTrue(constituents.refresh_due(UNIVERSE))
+
+
+class SaveSnapshotTest(unittest.TestCase):
+    def test_saves_within_the_same_second_keep_both_versions(self):
+        with tempfile.TemporaryDirectory() as store, mock.patch.object(constituents, "STORE_DIR", store):
+            constituents.read_snapshot.clear()
+            for symbol in ("A", "B"):
+                constituents.save_snapshot("Test", pd.DataFrame({"Symbol": [symbol], "Security": [symbol], "Sector": [""]}))
+            self.assertEqual(len(constituents.list_versions("Test")), 2)
+        constituents.read_snapshot.clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from export import EXPORT_FORMATS, ExportTooLargeError, export_to_file
+
+
+def sample_frames(tickers="ABCDE", rows=20_000):
+    for ticker in tickers:
+        yield pd.DataFrame({"Ticker": ticker, "Close": np.linspace(1, 2, rows)})
+
+
+class ExportSizeLimitTest(unittest.TestCase):
+    def test_limit(self):
+        for fmt in EXPORT_FORMATS:
+            with self.subTest(fmt=fmt):
+                with export_to_file(sample_frames(), fmt) as export_file:
+                    self.assertGreater(len(export_file.read()), 0)
+                with self.assertRaises(ExportTooLargeError):
+                    export_to_file(sample_frames(), fmt, max_bytes=10_000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import kernels
+from indicators import cci_values, hma_values, psar_values, wma_values
+
+
+def reference_wma(series, period):
+    weights = np.arange(1, period + 1, dtype="float64")
+    return series.rolling(period).apply(lambda window: np.dot(window, weights) / weights.sum(), raw=True)
+
+
+def reference_hma(series, period):
+    raw = 2 * reference_wma(series, max(period // 2, 1)) - reference_wma(series, period)
+    return reference_wma(raw, max(int(np.sqrt(period)), 1))
+
+
+def reference_cci(high, low, close, period):
+    typical = (high + low + close) / 3
+    mean_deviation = typical.rolling(period).apply(lambda window: np.abs(window - window.mean()).mean(), raw=True)
+    return (typical - typical.rolling(period).mean()) / (0.015 * mean_deviation)
+
+
+def reference_psar(high, low, step=0.02, max_step=0.2):
+    """Wilder's Parabolic SAR written out bar by bar, starting in an uptrend."""
+    sar, ep, af, up = low[0], high[0], step, True
+    out = [np.nan]
+    for t in range(1, len(high)):
+        nxt = sar + af * (ep - sar)
+        if up:
+            nxt = min([nxt] + list(low[max(t - 2, 0):t]))
+            reverse = low[t] < nxt
+        else:
+            nxt = max([nxt] + list(high[max(t - 2, 0):t]))
+            reverse = high[t] > nxt
+        if reverse:
+            sar, ep, af, up = ep, (low[t] if up else high[t]), step, not up
+        else:
+            sar = nxt
+            if (high[t] > ep) if up else (low[t] < ep):
+                ep = high[t] if up else low[t]
+                af = min(af + step, max_step)
+        out.append(sar)
+    return np.array(out)
+
+
+def sample_bars(bars=600, tickers=3, seed=0):
+    rng = np.random.default_rng(seed)
+    close = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (bars, tickers)), axis=0)),
+                         columns=[f"T{i}" for i in range(tickers)])
+    spread = close * np.abs(rng.normal(0, 0.01, close.shape))
+    close.iloc[50:55, 1] = np.nan
+    return close + spread, close - spread, close
+
+
+class IndicatorReferenceTest(unittest.TestCase):
+    def setUp(self):
+        self.high, self.low, self.close = sample_bars()
+        self.addCleanup(kernels.set_backend, kernels.get_backend())
+
+    def backends(self):
+        return [backend for backend in kernels.BACKENDS
+                if backend != "numba" or kernels.importlib.util.find_spec("numba")]
+
+    def test_wma_and_hma(self):
+        for period in (1, 2, 9, 20, 200):
+            for column in self.close:
+                with self.subTest(period=period, ticker=column):
+                    series = self.close[column]
+                    pd.testing.assert_series_equal(wma_values(series, period), reference_wma(series, period), check_names=False, rtol=1e-9)
+                    pd.testing.assert_series_equal(hma_values(series, period), reference_hma(series, period), check_names=False, rtol=1e-9)
+            pd.testing.assert_frame_equal(wma_values(self.close, period), self.close.apply(reference_wma, args=(period,)),
+                                          check_names=False, rtol=1e-9)
+
+    def test_cci(self):
+        for backend in self.backends():
+            kernels.set_backend(backend)
+            for period in (5, 20, 100):
+                with self.subTest(backend=backend, period=period):
+                    expected = pd.DataFrame({
+                        column: reference_cci(self.high[column], self.low[column], self.close[column], period)
+                        for column in self.close
+                    })
+                    pd.testing.assert_frame_equal(cci_values(self.high, self.low, self.close, period), expected, check_names=False, rtol=1e-9)
+
+    def test_psar(self):
+        high, low = self.high["T0"], self.low["T0"]
+        expected = reference_psar(high.to_numpy(), low.to_numpy())
+        for backend in self.backends():
+            kernels.set_backend(backend)
+            with self.subTest(backend=backend):
+                np.testing.assert_allclose(psar_values(high, low).to_numpy(), expected, rtol=1e-12)
+
+    def test_short_and_empty_input(self):
+        for values in (self.close.iloc[:3], self.close.iloc[:0]):
+            self.assertTrue(wma_values(values, 20).isna().all().all())
+            self.assertTrue(cci_values(values, values, values, 20).isna().all().all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from intent_router import classify
+
+# Prompt -> expected intent (None: goes to the agent team) and ticker
+ROUTES = [
+    # Simple lookups answered locally
+    ("What is the current stock price of apple?", "price", "AAPL"),
+    ("How much did MSFT move this month?", "change", "MSFT"),
+    ("RSI of nvidia", "indicator", "NVDA"),
+    ("market cap of AAPL", "market_cap", "AAPL"),
+    ("How much is Microsoft worth?", "market_cap", "MSFT"),
+    ("What's Tesla's valuation?", "market_cap", "TSLA"),
+    # Dates and periods in the past
+    ("Apple price in 2020?", None, None),
+    ("What was Tesla's price on March 3?", None, None),
+    ("AAPL price on 3/3", None, None),
+    ("What was the close of NVDA yesterday?", None, None),
+    # Highs, lows and derivatives
+    ("What's the all time high price of Apple?", None, None),
+    ("Microsoft 52 week low", None, None),
+    ("AAPL options price", None, None),
+    ("What's the price target for Amazon?", None, None),
+    # Open-ended questions
+    ("Tell me about Amazon's AI business and its price moves", None, None),
+    ("Explain Tesla's price move today", None, None),
+    ("Why did the AAPL price drop?", None, None),
+    ("Compare AAPL and MSFT", None, None),
+]
+
+
+class ClassifyTest(unittest.TestCase):
+    def test_routes(self):
+        for prompt, intent, ticker in ROUTES:
+            with self.subTest(prompt=prompt):
+                routed_intent, routed_ticker, _ = classify(prompt)
+                self.assertEqual(routed_intent, intent)
+                self.assertEqual(routed_ticker, ticker)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import datetime
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+from price_store import PriceStore, build_store
+
+
+def sample_panel(start="2024-01-02", bars=20):
+    index = pd.bdate_range(start, periods=bars, tz="America/New_York", name="Date")
+    close = pd.DataFrame({"AAA": np.linspace(10, 20, bars)}, index=index)
+    return pd.concat({field: close for field in ["Open", "High", "Low", "Close", "Volume"]},
+                     axis=1, names=["Price", "Ticker"])
+
+
+class PriceStoreCoverageTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        build_store(sample_panel(), directory.name, start="2024-01-01")
+        self.store = PriceStore.attach(directory.name)
+        self.today = datetime.date.today()
+
+    def test_covers(self):
+        self.assertTrue(self.store.covers(datetime.date(2024, 1, 1), self.today))
+        self.assertFalse(self.store.covers(datetime.date(2023, 6, 1), self.today))
+        self.assertFalse(self.store.covers(datetime.date(2024, 1, 1), self.today + datetime.timedelta(days=1)))
+        self.assertFalse(self.store.covers(datetime.date(2024, 1, 1), None))
+        self.assertFalse(self.store.covers(None, self.today))
+
+    def test_load_data_downloads_ranges_outside_the_store(self):
+        downloaded = pd.DataFrame()
+        with mock.patch.object(data_loader, "_data_provider", data_loader.yahoo_download), \
+                mock.patch.object(data_loader, "get_price_store", return_value=self.store), \
+                mock.patch.object(data_loader, "_load_data", return_value=downloaded) as load:
+            stored = data_loader.load_data("AAA", datetime.date(2024, 1, 1), self.today)
+            self.assertEqual(len(stored), 20)
+            load.assert_not_called()
+            for start, end in [(datetime.date(2023, 6, 1), self.today),
+                               (datetime.date(2024, 1, 1), self.today + datetime.timedelta(days=1)),
+                               (datetime.date(2024, 1, 1), None)]:
+                with self.subTest(start=start, end=end):
+                    self.assertIs(data_loader.load_data("AAA", start, end), downloaded)
+
+
+if __name__ == "__main__":
+    unittest.main()
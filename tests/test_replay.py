@@ -0,0 +1,33 @@
+import datetime
+import unittest
+
+import data_loader
+from replay import ReplayProvider
+
+
+class ReplayLoadDataTest(unittest.TestCase):
+    def setUp(self):
+        self.previous = data_loader.get_data_provider()
+        self.provider = ReplayProvider(speed=0)
+        data_loader.set_data_provider(self.provider)
+
+    def tearDown(self):
+        data_loader.set_data_provider(self.previous)
+
+    def test_advance_releases_a_bar_through_today(self):
+        # The Home page asks for [start, today)
+        start, end = datetime.date(2024, 1, 1), datetime.date.today()
+        before = data_loader.load_data("AAPL", start, end)
+        self.provider.advance()
+        after = data_loader.load_data("AAPL", start, end)
+        self.assertEqual(len(after), len(before) + 1)
+        self.assertEqual(after.index[-1].date(), self.provider.latest_time("AAPL").date())
+
+    def test_past_end_still_bounds_the_bars(self):
+        end = datetime.date.today() - datetime.timedelta(days=30)
+        df = data_loader.load_data("AAPL", datetime.date(2024, 1, 1), end)
+        self.assertLess(df.index[-1].date(), end)
+
+
+if __name__ == "__main__":
+    unittest.main()
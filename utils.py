@@ -1,6 +1,5 @@
-import cufflinks as cf
-
 def configure_cufflinks():
-    """Configures cufflinks for offline use."""
+    """Configures cufflinks for offline use. cufflinks is imported on first call."""
+    import cufflinks as cf
     cf.go_offline()
     cf.set_config_file(offline=True, world_readable=False)
\ No newline at end of file
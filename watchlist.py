@@ -0,0 +1,133 @@
+"""
+Watchlist grid: the latest Technical Analysis Summary signals and a sparkline for many tickers at once.
+
+Everything comes from one (field, ticker) panel. Every indicator runs once over all tickers,
+and each sparkline is a min/max-decimated close series built from a plain figure dict.
+Both are cached by panel content, so reruns only re-send them.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from cache import cached
+from indicators import bollinger_values, macd_values, rsi_values, stochastic_values
+
+# Most points drawn per sparkline; longer series are decimated to it
+SPARKLINE_POINTS = 200
+
+SIGNAL_COLUMNS = ["SMA", "RSI", "MACD", "Bollinger", "Stochastic"]
+
+
+def _latest(values, rows):
+    """Each ticker's value on its own last bar (tickers may stop at different dates)."""
+    return values.to_numpy()[rows, np.arange(values.shape[1])]
+
+
+@cached("watchlist", max_entries=64)
+def summary_signals(panel, sma_period=20, rsi_period=14, rsi_upper=70, rsi_lower=30,
+                    macd_fast=12, macd_slow=26, macd_signal=9, bb_period=20, bb_std=2,
+                    stoch_k=14, stoch_d=3):
+    """
+    Computes the Home page's summary signals for every ticker of a panel in one pass.
+    Returns one row per ticker with Close, Change (over the last bar), RSI, and the
+    SMA, RSI, MACD, Bollinger and Stochastic signals.
+    """
+    close, high, low = panel["Close"], panel["High"], panel["Low"]
+    valid = close.notna().to_numpy()
+    rows = len(close) - 1 - np.argmax(valid[::-1], axis=0)
+    latest_close = _latest(close, rows)
+    previous_close = close.to_numpy()[np.maximum(rows - 1, 0), np.arange(close.shape[1])]
+
+    sma = _latest(close.rolling(window=sma_period).mean(), rows)
+    rsi = _latest(rsi_values(close, rsi_period), rows)
+    _, _, macd, signal, _ = macd_values(close, macd_fast, macd_slow, macd_signal)
+    _, _, upper, lower = bollinger_values(close, bb_period, bb_std)
+    upper, lower = _latest(upper, rows), _latest(lower, rows)
+    k = _latest(stochastic_values(high, low, close, stoch_k, stoch_d)[2], rows)
+
+    def banded(value, above, below, labels=("OVERBOUGHT", "OVERSOLD", "NEUTRAL")):
+        # Missing values (too little history) get no signal
+        return np.where(np.isnan(value), "", np.where(value > above, labels[0], np.where(value < below, labels[1], labels[2])))
+
+    def crossed(value, reference):
+        return np.where(np.isnan(value) | np.isnan(reference), "",
+                        np.where(value > reference, "BULLISH", "BEARISH"))
+
+    signals = pd.DataFrame({
+        "Close": latest_close,
+        "Change": latest_close / previous_close - 1,
+        "RSI value": rsi,
+        "SMA": crossed(latest_close, sma),
+        "RSI": banded(rsi, rsi_upper, rsi_lower),
+        "MACD": crossed(_latest(macd, rows), _latest(signal, rows)),
+        "Bollinger": banded(latest_close, upper, lower),
+        "Stochastic": banded(k, 80, 20),
+    }, index=close.columns)
+    return signals[valid.any(axis=0)]
+
+
+def decimate(close, points=SPARKLINE_POINTS):
+    """
+    Downsamples every column of a (time, ticker) frame to about `points` bars, keeping
+    each bucket's lowest and highest close in time order so spikes survive, plus the
+    first and last bar. Returns the row positions to keep, one column per ticker.
+    """
+    n, width = close.shape
+    buckets = max(points // 2, 1)
+    if n <= points:
+        return np.repeat(np.arange(n)[:, None], width, axis=1)
+    size = -(-n // buckets)
+    # Pad the front so the buckets line up with the latest bar
+    pad = size * -(-n // size) - n
+    values = np.vstack([np.full((pad, width), np.nan), close.to_numpy(dtype="float64")])
+    values = values.reshape(-1, size, width)
+    lows = np.where(np.isnan(values), np.inf, values).argmin(axis=1)
+    highs = np.where(np.isnan(values), -np.inf, values).argmax(axis=1)
+    offsets = np.arange(values.shape[0])[:, None] * size - pad
+    pairs = np.stack([np.minimum(lows, highs), np.maximum(lows, highs)], axis=1) + offsets[:, None]
+    ends = np.array([[0], [n - 1]]).repeat(width, axis=1)
+    return np.clip(np.vstack([ends[:1], pairs.reshape(-1, width), ends[1:]]), 0, n - 1)
+
+
+def sparkline_specs(close, points=SPARKLINE_POINTS, height=70):
+    """
+    Builds a compact line chart per ticker as a plotly figure dict.
+    Green when the close is up over the range.
+    """
+    positions = decimate(close, points)
+    dates = close.index.strftime("%Y-%m-%d").to_numpy()
+    values = close.to_numpy(dtype="float64")
+    specs = {}
+    for column, ticker in enumerate(close.columns):
+        keep = np.unique(positions[:, column])
+        keep = keep[~np.isnan(values[keep, column])]
+        if not len(keep):
+            continue
+        y = values[keep, column]
+        color = "#26a69a" if y[-1] >= y[0] else "#ef5350"
+        specs[ticker] = {
+            "data": [{
+                "type": "scatter",
+                "x": dates[keep].tolist(),
+                "y": y.round(4).tolist(),
+                "mode": "lines",
+                "line": {"color": color, "width": 1.5},
+                "hovertemplate": "%{x}: %{y:.2f}<extra></extra>",
+            }],
+            "layout": {
+                "height": height,
+                "margin": {"l": 0, "r": 0, "t": 0, "b": 0},
+                "xaxis": {"visible": False},
+                "yaxis": {"visible": False},
+                "showlegend": False,
+            },
+        }
+    return specs
+
+
+@cached("watchlist", max_entries=64)
+def sparkline_figures(close, points=SPARKLINE_POINTS, height=70):
+    """
+    Sparkline figures per ticker. They are validated once here; st.plotly_chart would
+    otherwise re-validate a dict spec on every rerun, which dominates the grid's render time.
+    """
+    return {ticker: go.Figure(spec) for ticker, spec in sparkline_specs(close, points, height).items()}